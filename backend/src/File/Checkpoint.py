@@ -0,0 +1,35 @@
+import os
+import sqlite3
+
+
+class ScrapeCheckpoint:
+    """Stores scraped text per DataFrame row in SQLite so a rescrape can resume."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS scraped (row_index INTEGER PRIMARY KEY, url TEXT, text TEXT NOT NULL)"
+        )
+        self.connection.commit()
+
+    def completed(self) -> dict:
+        """Return {row_index: (url, text)} for every row already scraped."""
+        return {index: (url, text) for index, url, text in self.connection.execute("SELECT * FROM scraped")}
+
+    def write(self, rows: list) -> None:
+        """Persist (row_index, url, text) tuples in a single transaction."""
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO scraped VALUES (?, ?, ?)", rows)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    @staticmethod
+    def remove(path: str) -> None:
+        """Delete a closed checkpoint together with its WAL files."""
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
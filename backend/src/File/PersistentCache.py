@@ -0,0 +1,65 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class PersistentCache:
+    """SQLite-backed key/value cache with a TTL and least-recently-used eviction.
+
+    Values are stored as JSON. Entries older than `ttl` seconds are treated as
+    missing, and once more than `max_entries` are stored the least recently used
+    ones are evicted. Safe to share between threads.
+    """
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600, max_entries: int = 10000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT, key TEXT, value TEXT, created_at REAL, accessed_at REAL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+    def get(self, namespace: str, key: str, default=None):
+        now = time.time()
+        with self.lock, self.connection:
+            row = self.connection.execute(
+                "SELECT value, created_at FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            if row is None:
+                return default
+            if now - row[1] > self.ttl:
+                self.connection.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+                return default
+            self.connection.execute(
+                "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?", (now, namespace, key)
+            )
+        return json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value) -> None:
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)", (namespace, key, json.dumps(value), now, now)
+            )
+            (count,) = self.connection.execute("SELECT COUNT(*) FROM cache").fetchone()
+            if count > self.max_entries:
+                # Expired entries go first, then the least recently used ones
+                count -= self.connection.execute("DELETE FROM cache WHERE created_at < ?", (now - self.ttl,)).rowcount
+            if count > self.max_entries:
+                self.connection.execute(
+                    "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def close(self) -> None:
+        self.connection.close()
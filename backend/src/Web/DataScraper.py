@@ -1,9 +1,13 @@
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
+from src.config import SCRAPER_CACHE_PATH
+from src.File.Checkpoint import ScrapeCheckpoint
+from src.File.PersistentCache import PersistentCache
 from src.Logging.Logging import logger
 from src.Web.SSLAdapter import SSLAdapter
 
@@ -16,11 +20,17 @@ class DataScraper:
         self,
         id_column: str = "Slug",
         target_id: int = 283,
+        max_workers: int = 8,
+        cache_path: str = SCRAPER_CACHE_PATH,
+        cache_ttl: float = 7 * 24 * 3600,
+        cache_max_entries: int = 10000,
     ):
         self.id_column = id_column
         self.target_id = target_id
+        self.max_workers = max_workers
         self.session = requests.Session()
-        self.session.mount("https://", SSLAdapter())
+        self.session.mount("https://", SSLAdapter(pool_connections=max_workers, pool_maxsize=max_workers))
+        self.cache = PersistentCache(cache_path, ttl=cache_ttl, max_entries=cache_max_entries)
         self.header = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
             " (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
@@ -54,25 +64,69 @@ class DataScraper:
             logger.info(f"Error accessing URL {url}: {str(e)}")
             return ""
 
-    def update_empty_text(self):
-        df_empty_text = self.df[self.df["Text"].isna() & (self.df.index >= self.start_row)]
+    def update_empty_text(self, max_workers: int = None, checkpoint_path: str = None, flush_every: int = 50):
+        """Rescrape rows with empty text concurrently, checkpointing results to SQLite.
+
+        Rows already in the checkpoint are restored instead of fetched again, so an
+        interrupted run resumes where it stopped. A row is only restored when its
+        URL still matches the checkpointed one, and the checkpoint is removed once
+        the Excel file has been written. Empty results (failed requests) are not
+        checkpointed and are retried on the next run.
+        """
+        max_workers = max_workers or self.max_workers
+        if checkpoint_path is None:
+            checkpoint_path = os.path.splitext(self.excel_file_path)[0] + ".checkpoint.sqlite"
+        checkpoint = ScrapeCheckpoint(checkpoint_path)
 
-        for index, row in df_empty_text.iterrows():
-            scraped_text = self.scrape_and_fill_text(row["URL"])
-            self.df.at[index, "Text"] = scraped_text
+        df_empty_text = self.df[self.df["Text"].isna() & (self.df.index >= self.start_row)]
+        # Only trust a checkpointed row if the sheet still has the same URL there
+        restored = {
+            index: text
+            for index, (url, text) in checkpoint.completed().items()
+            if index in df_empty_text.index and df_empty_text.at[index, "URL"] == url
+        }
+        for index, text in restored.items():
+            self.df.at[index, "Text"] = text
+        pending = df_empty_text[~df_empty_text.index.isin(list(restored))]
+        logger.info(f"Rescraping {len(pending)} URLs, {len(df_empty_text) - len(pending)} restored from {checkpoint_path}")
+
+        # Let every worker keep its own pooled connection on the shared session
+        self.session.mount("https://", SSLAdapter(pool_connections=max_workers, pool_maxsize=max_workers))
+        buffer = []
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(self.scrape_and_fill_text, url): index for index, url in pending["URL"].items()}
+                for future in as_completed(futures):
+                    index = futures[future]
+                    scraped_text = future.result()
+                    self.df.at[index, "Text"] = scraped_text
+                    if scraped_text:
+                        buffer.append((int(index), self.df.at[index, "URL"], scraped_text))
+                    if len(buffer) >= flush_every:
+                        checkpoint.write(buffer)
+                        buffer = []
+        finally:
+            checkpoint.write(buffer)
+            checkpoint.close()
 
         self.df.to_excel(self.excel_file_path, index=False)
+        ScrapeCheckpoint.remove(checkpoint_path)
         logger.info("Rescraping process and overwriting to Excel completed")
 
     def google_scrape_articles(self, search_keyword: str, top_article_index: int = 3, sleep_time: int = 3):
         # time.sleep(sleep_time)
 
+        cached_articles = self.cache.get("search", search_keyword)
+        if cached_articles is not None:
+            logger.info(f"Using cached search results for {search_keyword}")
+            return cached_articles[:top_article_index]
+
         articles_list = []
         headers = self.header
         url = f"https://google.com/search?q={search_keyword}"
 
         logger.info(f"Sending request to {url}...")
-        response = requests.get(url, headers=headers, verify=False)
+        response = self.session.get(url, headers=headers, verify=False)
 
         if response.status_code == 200:
             logger.info("Request successful. Parsing articles...")
@@ -85,6 +139,7 @@ class DataScraper:
                     title = result.find("h3").get_text()
                     link = result.find("a")["href"]
                     articles_list.append({"title": title, "link": link})
+                self.cache.set("search", search_keyword, articles_list)
             else:
                 logger.info("No articles found on the page.")
         else:
@@ -93,14 +148,20 @@ class DataScraper:
         return articles_list[:top_article_index]
 
     def scrape_article_content(self, article_link: str):
+        cached_content = self.cache.get("article", article_link)
+        if cached_content is not None:
+            logger.info(f"Using cached content for {article_link}")
+            return cached_content
+
         logger.info(f"Request sent: {article_link}...")
 
         try:
-            response = requests.get(article_link, headers=self.header, verify=True)
+            response = self.session.get(article_link, headers=self.header, verify=True, timeout=10)
             if response.status_code == 200:
                 soup = BeautifulSoup(response.content, "html.parser")
                 paragraphs = soup.find_all("p")
                 article_content = "\n".join(p.get_text() for p in paragraphs)
+                self.cache.set("article", article_link, article_content)
                 return article_content
             else:
                 logger.info("Failed to retrieve article content. " f"Status code: {response.status_code}")
@@ -110,23 +171,26 @@ class DataScraper:
             logger.info(f"Error retrieving {article_link}: {str(e)}")
             return None
 
+    def fetch_article(self, article_link: str, max_retries: int = 1):
+        retries = 0
+        content = None
+
+        while content is None and retries < max_retries:
+            content = self.scrape_article_content(article_link)
+            retries += 1
+            if content is None:
+                logger.info(f"Retry {retries} for link: {article_link}")
+        return content
+
     def process_search(self, search_keyword: str, top_article_index: int = 1):
         max_retries = 1
         articles_list = self.google_scrape_articles(search_keyword, top_article_index=top_article_index)
         logger.info(search_keyword)
         logger.info(articles_list)
-        result = []
-
-        for item in articles_list:
-            retries = 0
-            content = None
-
-            while content is None and retries < max_retries:
-                content = self.scrape_article_content(item["link"])
-                retries += 1
-                if content is None:
-                    logger.info(f"Retry {retries} for link: {item['link']}")
+        if not articles_list:
+            return []
 
-            if content is not None:
-                result.append(content)
-        return result
+        # Fetch the articles in parallel over the pooled session, keeping search order
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(articles_list))) as executor:
+            contents = executor.map(lambda item: self.fetch_article(item["link"], max_retries), articles_list)
+            return [content for content in contents if content is not None]
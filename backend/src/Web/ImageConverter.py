@@ -1,22 +1,99 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 from PIL import Image
 
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+
+def convert_image(original_path: str, webp_path: str, new_size: tuple, remove_original: bool = True, use_draft: bool = True):
+    """Resize one image to `new_size` and save it as WebP. Runs in worker processes."""
+    with Image.open(original_path) as img:
+        if use_draft and img.format == "JPEG":
+            # Let the JPEG decoder downscale by up to 8x while decoding, keeping at least new_size
+            img.draft(img.mode, new_size)
+        resized_img = img.resize(new_size, Image.Resampling.LANCZOS)
+        resized_img.save(webp_path, "WEBP")
+
+    if remove_original:
+        os.remove(original_path)
+    return original_path, webp_path
+
 
 class ImageConverter:
-    def __init__(self, directory_path: str, new_size: tuple):
+    """Resizes PNG/JPEG images to WebP, across a process pool unless `max_workers` is 1.
+
+    Images whose WebP output is at least as new as the original are not converted
+    again, so re-running over a directory (or a tree, with `recursive=True`) only
+    converts new or modified files. With `remove_originals=True` such originals
+    are still removed, as they would have been after converting them.
+    """
+
+    def __init__(
+        self,
+        directory_path: str,
+        new_size: tuple,
+        recursive: bool = False,
+        max_workers: int = None,
+        remove_originals: bool = True,
+        use_draft: bool = True,
+    ):
         self.directory_path = directory_path
         self.new_size = new_size
+        self.recursive = recursive
+        self.max_workers = max_workers
+        self.remove_originals = remove_originals
+        self.use_draft = use_draft
 
-    def convert_images(self):
-        for filename in os.listdir(self.directory_path):
-            if filename.lower().endswith((".png", ".jpg", ".jpeg")):
-                original_path = os.path.join(self.directory_path, filename)
-                webp_path = os.path.join(self.directory_path, os.path.splitext(filename)[0] + ".webp")
+    def find_images(self):
+        """Yield (original_path, webp_path) for every PNG/JPEG image."""
+        if self.recursive:
+            walk = os.walk(self.directory_path)
+        else:
+            walk = [(self.directory_path, None, os.listdir(self.directory_path))]
+
+        for directory, _, filenames in walk:
+            for filename in filenames:
+                if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                original_path = os.path.join(directory, filename)
+                webp_path = os.path.join(directory, os.path.splitext(filename)[0] + ".webp")
+                yield original_path, webp_path
 
-                with Image.open(original_path) as img:
-                    resized_img = img.resize(self.new_size, Image.Resampling.LANCZOS)
-                    resized_img.save(webp_path, "WEBP")
+    @staticmethod
+    def is_up_to_date(original_path: str, webp_path: str) -> bool:
+        return os.path.exists(webp_path) and os.path.getmtime(webp_path) >= os.path.getmtime(original_path)
 
+    def convert_images(self):
+        jobs = []
+        for original_path, webp_path in self.find_images():
+            if not self.is_up_to_date(original_path, webp_path):
+                jobs.append((original_path, webp_path))
+            elif self.remove_originals:
                 os.remove(original_path)
-                print(f"Converted, resized, and replaced: {filename} to " f"{os.path.basename(webp_path)}")
+                print(f"Removed {os.path.basename(original_path)}, {os.path.basename(webp_path)} is up to date")
+        convert = partial(
+            convert_image, new_size=self.new_size, remove_original=self.remove_originals, use_draft=self.use_draft
+        )
+
+        if self.max_workers == 1:
+            return self._report(convert(original, webp) for original, webp in jobs)
+
+        workers = self.max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                convert,
+                [original for original, _ in jobs],
+                [webp for _, webp in jobs],
+                chunksize=max(1, len(jobs) // (4 * workers)),
+            )
+            return self._report(results)
+
+    def _report(self, results):
+        converted = []
+        action = "Converted, resized, and replaced" if self.remove_originals else "Converted and resized"
+        for original_path, webp_path in results:
+            converted.append(webp_path)
+            print(f"{action}: {os.path.basename(original_path)} to " f"{os.path.basename(webp_path)}")
+        return converted
@@ -13,3 +13,5 @@ DATA_FILE_PATH = f".data/{FolderYear}/{FolderDate}/{DataFileName}"
 # DATA_DIR_PATH = f"{FolderDate}/"
 DATA_DIR_PATH = "data/"
 os.makedirs(os.path.dirname(DATA_DIR_PATH), exist_ok=True)
+
+SCRAPER_CACHE_PATH = ".cache/DataScraper.sqlite"
@@ -0,0 +1,37 @@
+# Benchmarks run from the repository root, e.g. `python -m benchmarks.categorizer`.
+# Make the vector_test modules importable the same way vector_test.py sees them.
+import os
+import sys
+import types
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VECTOR_TEST_DIR = os.path.join(ROOT_DIR, "vector_test")
+BACKEND_DIR = os.path.join(ROOT_DIR, "backend")
+
+if VECTOR_TEST_DIR not in sys.path:
+    sys.path.insert(0, VECTOR_TEST_DIR)
+
+# Keep tiktoken's encodings next to the benchmarks so that, once fetched (or copied
+# there), chunking benchmarks run offline. An explicit TIKTOKEN_CACHE_DIR wins
+os.environ.setdefault("TIKTOKEN_CACHE_DIR", os.path.join(ROOT_DIR, "benchmarks", ".tiktoken"))
+
+
+def load_backend():
+    """Make the backend `src` package importable for offline benchmarks.
+
+    src/__init__.py initialises Firebase from service account credentials, which
+    none of the benchmarked modules need, so the package is registered without
+    running it. Imports that run src/config.py create their .log/ and data/
+    folders under backend/, as they do when the app runs from there.
+    """
+    if "src" not in sys.modules:
+        package = types.ModuleType("src")
+        package.__path__ = [os.path.join(BACKEND_DIR, "src")]
+        sys.modules["src"] = package
+    cwd = os.getcwd()
+    os.chdir(BACKEND_DIR)
+    try:
+        import src.config  # noqa: F401
+        import src.Logging.Logging  # noqa: F401
+    finally:
+        os.chdir(cwd)
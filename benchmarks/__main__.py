@@ -0,0 +1,139 @@
+"""Run the offline benchmark suite and compare against the previous run.
+
+Every benchmark in benchmarks/suite.py is warmed up once and then timed
+`repeat` times. Results are written to benchmarks/results/<timestamp>_<commit>.json,
+and the minimum time of each benchmark is compared with the most recent earlier
+results file from the same kind of machine (architecture and CPU count) so
+regressions show up between commits. A benchmark that cannot run fails the run.
+
+    python -m benchmarks [--filter search] [--threshold 0.2] [--fail-on-regression]
+"""
+
+# Standard Libraries
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+# Local Modules
+from benchmarks import ROOT_DIR
+from benchmarks.suite import BENCHMARKS, BenchmarkError
+
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"], cwd=ROOT_DIR).returncode != 0
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if dirty else "")
+
+
+def run_benchmark(name, spec, repeat=None):
+    setup = spec["setup"](**spec["params"])
+    try:
+        fn = next(setup)
+        fn()  # Warm-up run, not recorded
+        times = []
+        for _ in range(repeat or spec["repeat"]):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    finally:
+        setup.close()
+    return {
+        "params": spec["params"],
+        "min": min(times),
+        "median": statistics.median(times),
+        "max": max(times),
+        "times": times,
+    }
+
+
+def previous_results(report, exclude):
+    # Timings from a different architecture or CPU count are not comparable
+    for path in sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")), reverse=True):
+        if path == exclude:
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        if (previous.get("machine"), previous.get("cpus")) == (report["machine"], report["cpus"]):
+            return path, previous
+    return None, {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=None, help="Override each benchmark's repeat count")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown ratio reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--no-save", action="store_true", help="Compare without writing a results file")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "benchmarks": {},
+        "errors": {},
+    }
+
+    for name, spec in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        try:
+            result = run_benchmark(name, spec, args.repeat)
+        except BenchmarkError as e:
+            report["errors"][name] = str(e)
+            print(f"{name:<16} FAILED: {e}")
+            continue
+        report["benchmarks"][name] = result
+        print(f"{name:<16} min {result['min'] * 1e3:>9.2f}ms  median {result['median'] * 1e3:>9.2f}ms")
+
+    path = None
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}_{commit}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved {os.path.relpath(path, ROOT_DIR)}")
+
+    regressions = []
+    previous_path, previous = previous_results(report, path)
+    if previous:
+        print(f"Compared with {os.path.basename(previous_path)} (commit {previous.get('commit')})")
+    else:
+        print(f"No earlier results from a {report['machine']} machine with {report['cpus']} CPUs to compare with")
+    for name, result in report["benchmarks"].items():
+        before = previous.get("benchmarks", {}).get(name)
+        if before is None or before.get("params") != result["params"]:
+            continue
+        change = result["min"] / before["min"] - 1
+        flag = "REGRESSION" if change > args.threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<16} {before['min'] * 1e3:>9.2f}ms -> {result['min'] * 1e3:>9.2f}ms  {change:>+7.1%} {flag}")
+
+    if report["errors"]:
+        print(f"\nFailed: {', '.join(report['errors'])}")
+        sys.exit(1)
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
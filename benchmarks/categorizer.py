@@ -0,0 +1,88 @@
+"""Agreement and throughput of the local centroid categorizer against LLM labels.
+
+Uses the gpt-4o labels stored in the llm_category column of
+vector_test/embedded_data.csv when it has any and falls back to a synthetic
+labelled set otherwise. Documents are split in two folds: centroids are fit on
+one fold and scored against the labels of the other.
+
+    python -m benchmarks.categorizer [--csv path/to/embedded_data.csv]
+"""
+
+# Standard Libraries
+import argparse
+import json
+import os
+
+# Third-Party Libraries
+import numpy as np
+
+# Local Modules
+from benchmarks import VECTOR_TEST_DIR
+from categorizer import CentroidCategorizer, evaluate
+
+
+def load_labelled_documents(csv_file):
+    import pandas as pd
+
+    df = pd.read_csv(csv_file, dtype=str)
+    # Only gpt-4o labels are a reference; the category column holds the categorizer's own
+    # predictions, except in CSVs written before local categorization, which have no llm_category
+    if "llm_category" in df.columns:
+        df = df[df["llm_category"].notna() & (df["llm_category"] != "")].assign(category=lambda d: d["llm_category"])
+    if df.empty:
+        return np.empty((0, 0), dtype=np.float32), np.empty(0, dtype=str)
+    df["content_vector"] = df.content_vector.apply(json.loads)
+    documents = df.groupby("title").agg(
+        content_vector=("content_vector", lambda v: np.mean(list(v), axis=0)),
+        category=("category", "first"),
+    )
+    return np.stack(documents["content_vector"]), np.asarray(documents["category"], dtype=str)
+
+
+def synthetic_documents(categories, n_documents=5000, dim=1536, noise=12.0, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(len(categories), dim))
+    labels = rng.integers(len(categories), size=n_documents)
+    vectors = centers[labels] + noise * rng.normal(size=(n_documents, dim))
+    return vectors.astype(np.float32), np.asarray(categories)[labels]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv", default=os.path.join(VECTOR_TEST_DIR, "embedded_data.csv"))
+    parser.add_argument("--min-margin", type=float, default=0.02)
+    args = parser.parse_args()
+
+    vectors, labels = load_labelled_documents(args.csv) if os.path.exists(args.csv) else ([], [])
+    if len(labels):
+        source = args.csv
+    else:
+        vectors, labels = synthetic_documents(
+            ["authentication", "models", "techniques", "tools", "setup", "billing_limits", "other"]
+        )
+        source = "synthetic"
+
+    categories = sorted(set(labels))
+    rng = np.random.default_rng(0)
+    folds = rng.permutation(len(labels)) % 2
+
+    print(f"Source: {source} ({len(labels)} documents, {len(categories)} categories)")
+    for fold in (0, 1):
+        train, test = folds != fold, folds == fold
+        categorizer = CentroidCategorizer(categories, min_margin=args.min_margin)
+        try:
+            categorizer.fit(vectors[train], labels[train])
+        except ValueError as e:
+            print(f"Fold {fold}: skipped ({e})")
+            continue
+        report = evaluate(categorizer, vectors[test], labels[test])
+        print(
+            f"Fold {fold}: agreement {report['agreement']:.1%}, "
+            f"low confidence {report['low_confidence']:.1%}, "
+            f"{report['docs_per_second']:,.0f} docs/s over {report['documents']} documents"
+        )
+    print("For comparison, the LLM path makes one gpt-4o request per document.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Latency of category pre-filtered search versus post-filtering a full scan.
+
+Post-filtering is the vectorized full scan: every vector is scored, then rows
+whose category (held in a NumPy array, compared in one pass) does not match are
+dropped before taking the top k. Pre-filtering looks up the category posting
+list in VectorIndex and scores only those rows.
+
+    python -m benchmarks.filtered_search [--rows 20000] [--dim 1536]
+"""
+
+# Standard Libraries
+import argparse
+import time
+
+# Third-Party Libraries
+import numpy as np
+
+# Local Modules
+from vector_index import VectorIndex
+
+SELECTIVITIES = (0.5, 0.1, 0.01, 0.001)
+
+
+def build_index(n_rows, dim, seed=0):
+    # Category "s<selectivity>" holds that share of the rows, "rest" holds the remainder
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n_rows, dim)).astype(np.float32)
+    categories = np.full(n_rows, "rest", dtype=object)
+    order = rng.permutation(n_rows)
+    start = 0
+    for selectivity in SELECTIVITIES:
+        size = max(1, int(n_rows * selectivity))
+        categories[order[start : start + size]] = f"s{selectivity}"
+        start += size
+    index = VectorIndex()
+    index.add([str(i) for i in range(n_rows)], vectors, [{"category": c} for c in categories])
+    return index
+
+
+def post_filter_search(index, categories, query, category, top_k):
+    # Score every vector, then mask out the rows in other categories
+    similarities = index.vectors @ (query / np.linalg.norm(query))
+    similarities[categories != category] = -np.inf
+    best = np.argpartition(-similarities, top_k - 1)[:top_k]
+    best = best[np.argsort(-similarities[best])]
+    return [index.ids[i] for i in best]
+
+
+def time_per_query(fn, queries, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for query in queries:
+            fn(query)
+        best = min(best, (time.perf_counter() - start) / len(queries))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=4)
+    args = parser.parse_args()
+
+    index = build_index(args.rows, args.dim)
+    categories = np.asarray([meta["category"] for meta in index.metadata])
+    queries = np.random.default_rng(1).normal(size=(args.queries, args.dim)).astype(np.float32)
+
+    print(f"{args.rows} rows x {args.dim} dims, top_k={args.top_k}")
+    print(f"{'selectivity':>12} {'matching':>9} {'post-filter':>12} {'pre-filter':>11} {'speedup':>8}")
+    for selectivity in SELECTIVITIES:
+        category = f"s{selectivity}"
+        matching = len(index.candidate_rows({"category": category}))
+        expected = post_filter_search(index, categories, queries[0], category, args.top_k)
+        actual = [r["id"] for r in index.search(queries[0], top_k=args.top_k, category=category)]
+        assert expected == actual, "pre-filtered search disagrees with post-filtering"
+
+        post = time_per_query(lambda q: post_filter_search(index, categories, q, category, args.top_k), queries)
+        pre = time_per_query(lambda q: index.search(q, top_k=args.top_k, category=category), queries)
+        print(f"{selectivity:>12.1%} {matching:>9} {post * 1e3:>10.2f}ms {pre * 1e3:>9.2f}ms {post / pre:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
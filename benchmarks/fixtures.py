@@ -0,0 +1,82 @@
+"""Offline fixtures shared by the benchmark suite.
+
+The HTML corpus is built from the documentation text stored in vector_test/data:
+each document becomes a page with the header, navigation, <main> and footer
+structure of a university site, linking to a few other pages so the crawler
+has a graph to walk.
+"""
+
+# Standard Libraries
+import contextlib
+import functools
+import glob
+import html
+import os
+import random
+import shutil
+import tempfile
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# Local Modules
+from benchmarks import VECTOR_TEST_DIR
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def load_text_corpus():
+    """Return {name: text} for every stored .txt document, in a stable order."""
+    documents = {}
+    for path in sorted(glob.glob(os.path.join(VECTOR_TEST_DIR, "data", "*.txt"))):
+        with open(path, "r", encoding="utf-8") as f:
+            documents[os.path.splitext(os.path.basename(path))[0]] = f.read()
+    return documents
+
+
+def render_page(name, text, links):
+    paragraphs = "\n".join(f"<p>{html.escape(p)}</p>" for p in text.split("\n\n") if p.strip())
+    nav = "\n".join(f'<li><a href="{link}.html">{html.escape(link)}</a></li>' for link in links)
+    return (
+        f"<!DOCTYPE html><html><head><title>{html.escape(name)}</title></head><body>"
+        f'<header><a href="index.html">Home</a></header><nav><ul>{nav}</ul></nav>'
+        f"<main><h1>{html.escape(name)}</h1>\n{paragraphs}</main>"
+        f"<footer><p>University of California, Santa Cruz</p></footer></body></html>"
+    )
+
+
+def build_html_corpus(directory, n_pages=None, links_per_page=5, seed=0):
+    """Write the corpus as linked HTML pages plus an index.html and return the page names."""
+    rng = random.Random(seed)
+    documents = list(load_text_corpus().items())
+    if n_pages is not None:
+        # Repeat the stored documents under new names to reach n_pages
+        repeated = documents * (n_pages // len(documents) + 1)
+        documents = [(f"{name}-{i // len(documents)}", text) for i, (name, text) in enumerate(repeated)][:n_pages]
+    names = [name for name, _ in documents]
+    for name, text in documents:
+        with open(os.path.join(directory, f"{name}.html"), "w", encoding="utf-8") as f:
+            f.write(render_page(name, text, rng.sample(names, min(links_per_page, len(names)))))
+    with open(os.path.join(directory, "index.html"), "w", encoding="utf-8") as f:
+        f.write(render_page("index", "Site index", names[:links_per_page]))
+    return names
+
+
+@contextlib.contextmanager
+def fixture_site(n_pages=None):
+    """Serve the HTML corpus from a local http.server and yield its base URL."""
+    directory = tempfile.mkdtemp()
+    build_html_corpus(directory, n_pages)
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(directory)
@@ -0,0 +1,110 @@
+"""Latency and recall of BM25 + vector hybrid search versus full dense search.
+
+Builds a synthetic chunk corpus where each chunk belongs to a topic: its vector
+is the topic centroid plus noise, and its text mixes common catalog words, words
+specific to the topic and a course code. Queries name a chunk's course code and a
+couple of its topic words, with a noisy copy of the chunk's vector standing in
+for the query embedding. Dense search scores every vector; hybrid search scores
+only the top BM25 candidates and fuses both rankings.
+
+Recall is the share of the dense top-k that hybrid search also returns; hit rate
+is how often the chunk the query was written for is in the top-k.
+
+    python -m benchmarks.hybrid_search [--rows 50000] [--dim 1536] [--candidates 50 100 200]
+"""
+
+# Standard Libraries
+import argparse
+import string
+import time
+
+# Third-Party Libraries
+import numpy as np
+
+# Local Modules
+from benchmarks.pdf_extraction import WORDS
+from vector_index import VectorIndex
+
+SUBJECTS = (
+    "CSE", "MATH", "AM", "STAT", "PHYS", "CHEM", "BIOL", "ECON", "PSYC", "LING", "HIS", "PHIL", "ART", "MUSC", "ENVS", "ECE"
+)
+COURSE_CODES = [f"{s} {n}{suffix}" for s in SUBJECTS for n in range(1, 300) for suffix in ("", "A", "B", "L")]
+
+
+def random_words(rng, n, length=(5, 10)):
+    letters = np.array(list(string.ascii_lowercase))
+    return ["".join(rng.choice(letters, size=rng.integers(*length))) for _ in range(n)]
+
+
+def build_corpus(n_rows, dim, n_topics=200, topic_words=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centroids = rng.normal(size=(n_topics, dim)).astype(np.float32)
+    vocabularies = [random_words(rng, topic_words) for _ in range(n_topics)]
+    topics = rng.integers(n_topics, size=n_rows)
+    vectors = centroids[topics] + rng.normal(scale=1.0, size=(n_rows, dim)).astype(np.float32)
+
+    # Like course pages split into several chunks, a course code appears in a few chunks
+    texts, codes = [], []
+    for topic in topics:
+        code = COURSE_CODES[rng.integers(len(COURSE_CODES))]
+        words = list(rng.choice(WORDS, size=40)) + list(rng.choice(vocabularies[topic], size=10))
+        rng.shuffle(words)
+        texts.append(f"{code} " + " ".join(words))
+        codes.append(code)
+
+    index = VectorIndex(text_field="text")
+    index.add([str(row) for row in range(n_rows)], vectors, [{"text": text} for text in texts])
+    return index, vectors, topics, vocabularies, codes
+
+
+def build_queries(rng, vectors, topics, vocabularies, codes, n_queries, noise=1.0):
+    targets = rng.choice(len(vectors), size=n_queries, replace=False)
+    queries = []
+    for row in targets:
+        text = f"{codes[row]} " + " ".join(rng.choice(vocabularies[topics[row]], size=2))
+        vector = vectors[row] + rng.normal(scale=noise, size=vectors.shape[1]).astype(np.float32)
+        queries.append((str(row), text, vector))
+    return queries
+
+
+def run(search, queries, top_k):
+    results = []
+    start = time.perf_counter()
+    for _, text, vector in queries:
+        results.append([row["id"] for row in search(text, vector, top_k)])
+    return results, (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--candidates", type=int, nargs="+", default=[50, 100, 200])
+    args = parser.parse_args()
+
+    index, vectors, topics, vocabularies, codes = build_corpus(args.rows, args.dim)
+    queries = build_queries(np.random.default_rng(1), vectors, topics, vocabularies, codes, args.queries)
+
+    dense, dense_latency = run(lambda text, vector, k: index.search(vector, top_k=k), queries, args.top_k)
+    print(f"{args.rows} chunks, dim {args.dim}, {args.queries} queries, top {args.top_k}")
+    print(f"{'mode':<22} {'ms/query':>9} {'speedup':>8} {'recall':>7} {'hit rate':>9}")
+
+    def report(label, results, latency):
+        recall = np.mean([len(set(got) & set(expected)) / len(expected) for got, expected in zip(results, dense)])
+        hits = np.mean([target in got for (target, _, _), got in zip(queries, results)])
+        print(f"{label:<22} {latency * 1e3:>9.2f} {dense_latency / latency:>7.1f}x {recall:>7.2f} {hits:>9.2f}")
+
+    report("dense (all vectors)", dense, dense_latency)
+    for candidates in args.candidates:
+        results, latency = run(
+            lambda text, vector, k: index.hybrid_search(text, vector, top_k=k, candidates=candidates),
+            queries,
+            args.top_k,
+        )
+        report(f"hybrid, {candidates} candidates", results, latency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Throughput of ImageConverter on a synthetic image tree.
+
+Generates JPEG and PNG photo-like images across a few subdirectories and
+converts copies of the tree with a single process and full decoding (the old
+behaviour), a single process with JPEG draft decoding, and the process pool
+with draft decoding. A final run over the converted tree shows the cost of the
+up-to-date check when nothing changed.
+
+    python -m benchmarks.image_converter [--images 48] [--size 2400x1600] [--target 480x320]
+"""
+
+# Standard Libraries
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+# Third-Party Libraries
+import numpy as np
+from PIL import Image
+
+# Local Modules
+from benchmarks import load_backend
+
+
+def make_image_tree(root, n_images, size, n_directories=4, seed=0):
+    rng = np.random.default_rng(seed)
+    width, height = size
+    # Smooth gradients plus noise compress like photographs rather than like pure noise
+    y, x = np.mgrid[0:height, 0:width]
+    for i in range(n_images):
+        directory = os.path.join(root, f"dir{i % n_directories}")
+        os.makedirs(directory, exist_ok=True)
+        base = (x * rng.uniform(0.05, 0.2) + y * rng.uniform(0.05, 0.2)) % 256
+        pixels = np.stack([base, base[::-1], base[:, ::-1]], axis=-1) + rng.normal(0, 12, size=(height, width, 3))
+        image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+        if i % 4 == 3:
+            image.save(os.path.join(directory, f"image{i}.png"))
+        else:
+            image.save(os.path.join(directory, f"image{i}.jpg"), quality=90)
+
+
+def run(label, source, target, **kwargs):
+    from src.Web.ImageConverter import ImageConverter
+
+    tree = tempfile.mkdtemp()
+    shutil.rmtree(tree)
+    shutil.copytree(source, tree)
+    total_bytes = sum(
+        os.path.getsize(os.path.join(directory, filename))
+        for directory, _, filenames in os.walk(tree)
+        for filename in filenames
+    )
+
+    converter = ImageConverter(tree, target, recursive=True, remove_originals=False, **kwargs)
+    start = time.perf_counter()
+    converted = converter.convert_images()
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    skipped_run = converter.convert_images()
+    rerun = time.perf_counter() - start
+    shutil.rmtree(tree)
+
+    return {
+        "label": label,
+        "images": len(converted),
+        "seconds": elapsed,
+        "per_image_ms": elapsed / max(1, len(converted)) * 1e3,
+        "images_per_second": len(converted) / elapsed,
+        "megabytes_per_second": total_bytes / elapsed / 1e6,
+        "directories": len({os.path.dirname(webp_path) for webp_path in converted}),
+        "rerun_seconds": rerun,
+        "rerun_converted": len(skipped_run),
+    }
+
+
+def parse_size(value):
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=48)
+    parser.add_argument("--size", type=parse_size, default=(2400, 1600))
+    parser.add_argument("--target", type=parse_size, default=(480, 320))
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    load_backend()
+    source = tempfile.mkdtemp()
+    try:
+        make_image_tree(source, args.images, args.size)
+        runs = [
+            run("sequential, full decode", source, args.target, max_workers=1, use_draft=False),
+            run("sequential, draft decode", source, args.target, max_workers=1),
+            run("process pool, draft decode", source, args.target, max_workers=args.workers),
+        ]
+    finally:
+        shutil.rmtree(source)
+
+    print(f"\n{args.images} images {args.size[0]}x{args.size[1]} -> {args.target[0]}x{args.target[1]}")
+    print(f"{'mode':<28} {'ms/image':>9} {'images/s':>9} {'MB/s':>7} {'ms/dir':>9} {'rerun':>9}")
+    for result in runs:
+        print(
+            f"{result['label']:<28} {result['per_image_ms']:>9.1f} {result['images_per_second']:>9.1f} "
+            f"{result['megabytes_per_second']:>7.1f} {result['seconds'] / result['directories'] * 1e3:>9.1f} "
+            f"{result['rerun_seconds'] * 1e3:>7.1f}ms"
+        )
+        assert result["rerun_converted"] == 0, "up-to-date images were converted again"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Time to first chunk and total time for PDF text extraction and chunking.
+
+Writes a synthetic multi-hundred-page text PDF, then compares the old path
+(extract every page in one thread with `text += page.extract_text()`, then
+tokenize the whole document) with iter_pdf_pages + chunked_pages, which
+extracts pages across a process pool and chunks them as they stream in.
+Chunking needs tiktoken's cl100k_base encoding to be cached locally.
+
+    python -m benchmarks.pdf_extraction [--pages 400] [--chunk-length 512]
+"""
+
+# Standard Libraries
+import argparse
+import os
+import random
+import tempfile
+import time
+
+# Third-Party Libraries
+from PyPDF2 import PdfReader
+
+# Local Modules
+from chunking import EMBEDDING_ENCODING, chunked_pages, chunked_tokens
+from pdf_extract import iter_pdf_pages
+
+WORDS = (
+    "course catalog undergraduate graduate credit prerequisite enrollment quarter units major minor "
+    "requirement elective seminar laboratory lecture department faculty admission transfer petition"
+).split()
+
+
+def write_text_pdf(path, n_pages, lines_per_page=50, seed=0):
+    """Write a minimal PDF with `n_pages` pages of Helvetica text."""
+    rng = random.Random(seed)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in range(n_pages):
+        lines = [f"CSE {100 + page % 90} page {page + 1}"]
+        lines += [" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(lines_per_page - 1)]
+        text = " T* ".join(f"({line}) Tj" for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 40 760 Td {text} ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode("ascii")
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, n_pages)
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+def sequential_chunks(pdf_path, chunk_length):
+    reader = PdfReader(pdf_path)
+    text = ""
+    for page in reader.pages:
+        text += page.extract_text()
+    for chunk in chunked_tokens(text, chunk_length, encoding_name=EMBEDDING_ENCODING):
+        yield chunk, None, None
+
+
+def streaming_chunks(pdf_path, chunk_length, max_workers=None):
+    yield from chunked_pages(iter_pdf_pages(pdf_path, max_workers=max_workers), chunk_length, EMBEDDING_ENCODING)
+
+
+def measure(chunks):
+    start = time.perf_counter()
+    first = None
+    count = 0
+    for _ in chunks:
+        if first is None:
+            first = time.perf_counter() - start
+        count += 1
+    return first, time.perf_counter() - start, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--chunk-length", type=int, default=512)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        pdf_path = os.path.join(directory, "catalog.pdf")
+        write_text_pdf(pdf_path, args.pages)
+        size_mb = os.path.getsize(pdf_path) / 1e6
+
+        print(f"{args.pages} pages ({size_mb:.1f} MB), {args.chunk_length}-token chunks, {os.cpu_count()} CPUs")
+        print(f"{'path':<34} {'first chunk':>12} {'total':>9} {'chunks':>7}")
+        runs = [
+            ("sequential +=, then tokenize", sequential_chunks(pdf_path, args.chunk_length)),
+            ("process pool, streamed chunks", streaming_chunks(pdf_path, args.chunk_length, args.workers)),
+        ]
+        for label, chunks in runs:
+            first, total, count = measure(chunks)
+            print(f"{label:<34} {first:>11.2f}s {total:>8.2f}s {count:>7}")
+
+        first_chunk = next(streaming_chunks(pdf_path, args.chunk_length, args.workers))
+        print(f"First streamed chunk cites pages {first_chunk[1]}-{first_chunk[2]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Exercise RateLimitedClient against a local stub that injects 429s and 500s.
+
+Checks that every request eventually succeeds and that the requests-per-minute
+limit is respected: with many more requests than the bucket holds, the run can
+only finish once the excess has been admitted at the steady rate. Reports the achieved throughput for the sync
+thread-pool path and the async path.
+
+    python -m benchmarks.rate_limited_client [--requests 400] [--rpm 3000]
+"""
+
+# Standard Libraries
+import argparse
+import concurrent.futures
+import time
+
+# Local Modules
+from api_client import RateLimitedClient
+from benchmarks.stub_openai import serve
+
+MODEL = "text-embedding-3-small"
+
+
+def run(label, server, client, embed):
+    before = server.statuses.copy()
+    start = time.perf_counter()
+    embeddings = embed()
+    elapsed = time.perf_counter() - start
+    statuses = server.statuses - before
+    attempts = sum(statuses.values())
+    print(
+        f"{label:>6}: {len(embeddings)} embeddings in {elapsed:.2f}s "
+        f"({len(embeddings) / elapsed:,.0f}/s, {attempts / elapsed * 60:,.0f} requests/min), "
+        f"429s {statuses[429]}, 500s {statuses[500]}"
+    )
+    return embeddings, attempts, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--rpm", type=int, default=3000)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.3)
+    parser.add_argument("--server-error-ratio", type=float, default=0.05)
+    args = parser.parse_args()
+
+    # Token ids, like the chunks vector_test.py embeds
+    inputs = [[i, i + 1, i + 2] for i in range(args.requests)]
+    with serve(rate_limit_ratio=args.rate_limit_ratio, server_error_ratio=args.server_error_ratio) as server:
+        for label in ("sync", "async"):
+            # A fresh client per run so both start with a full bucket
+            client = RateLimitedClient(
+                api_key="stub", base_url=server.base_url, requests_per_minute=args.rpm, max_retries=10, base_delay=0.05
+            )
+            if label == "sync":
+                with concurrent.futures.ThreadPoolExecutor(max_workers=client.max_concurrency) as executor:
+                    embed = lambda: list(executor.map(lambda text: client.embed(text, MODEL)[0], inputs))  # noqa: E731
+                    embeddings, attempts, elapsed = run(label, server, client, embed)
+            else:
+                embeddings, attempts, elapsed = run(label, server, client, lambda: client.embed_many(inputs, MODEL))
+
+            assert len(embeddings) == len(inputs) and all(len(e) == server.dim for e in embeddings)
+            # The bucket starts full, so only its capacity may go out as a burst; every
+            # attempt beyond that (retries included) has to wait for the steady rate
+            bucket = client.request_bucket
+            assert attempts > 2 * bucket.capacity, "too few requests to exercise the limiter"
+            minimum = (attempts - bucket.capacity) / bucket.rate
+            assert elapsed >= 0.95 * minimum, f"{attempts} requests took {elapsed:.2f}s, faster than {minimum:.2f}s"
+            allowed = bucket.capacity + elapsed * bucket.rate
+            assert attempts <= allowed, f"{attempts} requests exceeded the limit of {allowed:.0f}"
+            print(f"        {client.retries} retries, all {len(inputs)} requests succeeded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Local stand-in for the OpenAI embeddings and chat completions endpoints.
+
+Embeddings are deterministic pseudo-random unit vectors derived from the input,
+so repeated runs are comparable. A share of requests can be answered with 429
+or 500 to exercise retry logic, and every request is counted per status code.
+"""
+
+# Standard Libraries
+import contextlib
+import hashlib
+import json
+import random
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Third-Party Libraries
+import numpy as np
+
+
+def fake_embedding(value, dim):
+    seed = int.from_bytes(hashlib.sha1(json.dumps(value).encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).normal(size=dim)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class StubOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), dim=1536, rate_limit_ratio=0.0, server_error_ratio=0.0, seed=0):
+        super().__init__(address, StubOpenAIHandler)
+        self.dim = dim
+        self.rate_limit_ratio = rate_limit_ratio
+        self.server_error_ratio = server_error_ratio
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.statuses = Counter()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        with self.server.lock:
+            self.server.statuses[status] += 1
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with self.server.lock:
+            roll = self.server.random.random()
+        if roll < self.server.rate_limit_ratio:
+            error = {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}
+            return self._reply(429, {"error": error}, {"retry-after": "0.05"})
+        if roll < self.server.rate_limit_ratio + self.server.server_error_ratio:
+            return self._reply(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+
+        if self.path.endswith("/embeddings"):
+            inputs = request["input"]
+            if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+                inputs = [inputs]
+            data = [
+                {"object": "embedding", "index": i, "embedding": fake_embedding(value, self.server.dim)}
+                for i, value in enumerate(inputs)
+            ]
+            usage = {"prompt_tokens": 0, "total_tokens": 0}
+            return self._reply(200, {"object": "list", "data": data, "model": request["model"], "usage": usage})
+
+        if self.path.endswith("/chat/completions"):
+            message = {"role": "assistant", "content": "other"}
+            choice = {"index": 0, "message": message, "finish_reason": "stop"}
+            return self._reply(
+                200,
+                {"id": "stub", "object": "chat.completion", "created": 0, "model": request["model"], "choices": [choice]},
+            )
+
+        return self._reply(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+
+@contextlib.contextmanager
+def serve(**kwargs):
+    """Run a StubOpenAIServer on a background thread for the duration of the block."""
+    server = StubOpenAIServer(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,149 @@
+"""Offline benchmarks for the crawl, extraction, chunking, embedding and search paths.
+
+Each benchmark is a generator that sets up its fixtures, yields the callable
+to time, and cleans up once timing is done. `python -m benchmarks` runs them
+and records the results; see benchmarks/__main__.py.
+
+tiktoken caches its encodings in benchmarks/.tiktoken (see benchmarks/__init__.py).
+Run the suite once with network access, or copy cl100k_base there, and later
+runs are fully offline; without the encoding the chunking benchmark fails.
+"""
+
+# Standard Libraries
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+
+# Third-Party Libraries
+import numpy as np
+import tiktoken
+import tldextract
+from bs4 import BeautifulSoup
+
+# Local Modules
+from api_client import RateLimitedClient
+from benchmarks import load_backend
+from benchmarks.fixtures import build_html_corpus, fixture_site, load_text_corpus
+from benchmarks.hybrid_search import build_corpus, build_queries
+from benchmarks.stub_openai import serve
+from chunking import EMBEDDING_ENCODING
+from chunking import chunked_tokens as chunk_text
+from vector_index import VectorIndex
+
+BENCHMARKS = {}
+
+SEARCH_CORPUS_SIZES = (1_000, 10_000, 50_000)
+SEARCH_DIM = 1536
+
+
+class BenchmarkError(Exception):
+    """Raised during setup when a benchmark cannot run; the run is reported as failed."""
+
+
+def benchmark(name, repeat=5, **params):
+    """Register a setup generator under `name`, called with `params`."""
+
+    def register(setup):
+        BENCHMARKS[name] = {"setup": setup, "repeat": repeat, "params": params}
+        return setup
+
+    return register
+
+
+@contextmanager
+def quiet_logger():
+    # The crawler logs every page at INFO, which would dominate the timings
+    from src.Logging.Logging import logger
+
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    try:
+        yield
+    finally:
+        logger.setLevel(level)
+
+
+@benchmark("crawl", repeat=5, max_depth=3)
+def crawl(max_depth):
+    load_backend()
+    from src.Web.WebCrawler import ContentExtractor, LinkResolver, SessionManager, WebCrawler
+
+    # Use the public suffix list bundled with tldextract instead of fetching it
+    extract = tldextract.extract
+    tldextract.extract = tldextract.TLDExtract(suffix_list_urls=())
+    try:
+        with fixture_site() as base_url, quiet_logger():
+            crawler = WebCrawler(SessionManager, LinkResolver, ContentExtractor)
+            pages = list(crawler.crawl(base_url + "index.html", base_url, max_depth))
+            if len(pages) < 2:
+                raise BenchmarkError(f"fixture site crawl returned {len(pages)} pages")
+            yield lambda: list(crawler.crawl(base_url + "index.html", base_url, max_depth))
+    finally:
+        tldextract.extract = extract
+
+
+@benchmark("convert_to_md", repeat=5)
+def convert_to_md():
+    load_backend()
+    from src.Web.WebCrawler import ContentExtractor
+
+    with tempfile.TemporaryDirectory() as directory:
+        build_html_corpus(directory)
+        soups = []
+        for filename in sorted(os.listdir(directory)):
+            with open(os.path.join(directory, filename), "r", encoding="utf-8") as f:
+                soups.append(BeautifulSoup(f.read(), "html.parser"))
+
+    yield lambda: [ContentExtractor.convert_to_md(soup) for soup in soups]
+
+
+@benchmark("chunked_tokens", repeat=5, chunk_length=512)
+def chunked_tokens(chunk_length):
+    try:
+        tiktoken.get_encoding(EMBEDDING_ENCODING)
+    except Exception as e:
+        raise BenchmarkError(
+            f"{EMBEDDING_ENCODING} is not in {os.environ['TIKTOKEN_CACHE_DIR']} and could not be downloaded ({e}). "
+            "Run once with network access or copy the encoding there."
+        )
+
+    texts = list(load_text_corpus().values())
+    yield lambda: [list(chunk_text(text, chunk_length, encoding_name=EMBEDDING_ENCODING)) for text in texts]
+
+
+@benchmark("embed_many", repeat=5, n_inputs=256)
+def embed_many(n_inputs):
+    # Token ids, like the chunks vector_test.py embeds; no injected errors so timings are stable
+    inputs = [[i, i + 1, i + 2] for i in range(n_inputs)]
+    with serve() as server:
+        client = RateLimitedClient(api_key="stub", base_url=server.base_url, requests_per_minute=1_000_000)
+        yield lambda: client.embed_many(inputs, "text-embedding-3-small")
+
+
+def search_benchmark(n_rows):
+    @benchmark(f"search_{n_rows}", repeat=5, n_rows=n_rows, n_queries=50, top_k=4)
+    def search(n_rows, n_queries, top_k):
+        rng = np.random.default_rng(0)
+        index = VectorIndex()
+        categories = ["Undergraduate", "Graduate", "Courses", "Housing"]
+        index.add(
+            [str(i) for i in range(n_rows)],
+            rng.normal(size=(n_rows, SEARCH_DIM)).astype(np.float32),
+            [{"category": categories[i % len(categories)]} for i in range(n_rows)],
+        )
+        queries = rng.normal(size=(n_queries, SEARCH_DIM)).astype(np.float32)
+        yield lambda: [index.search(query, top_k=top_k) for query in queries]
+
+    return search
+
+
+for size in SEARCH_CORPUS_SIZES:
+    search_benchmark(size)
+
+
+@benchmark("hybrid_search_50000", repeat=5, n_rows=50_000, n_queries=50, top_k=4, candidates=100)
+def hybrid_search(n_rows, n_queries, top_k, candidates):
+    index, vectors, topics, vocabularies, codes = build_corpus(n_rows, SEARCH_DIM)
+    queries = build_queries(np.random.default_rng(1), vectors, topics, vocabularies, codes, n_queries)
+    yield lambda: [index.hybrid_search(text, vector, top_k=top_k, candidates=candidates) for _, text, vector in queries]
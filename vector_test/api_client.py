@@ -0,0 +1,210 @@
+# Standard Libraries
+import asyncio
+import random
+import threading
+import time
+
+# Third-Party Libraries
+import tiktoken
+
+# OpenAI Libraries
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    AsyncOpenAI,
+    OpenAI,
+)
+
+TOKEN_ENCODING = "cl100k_base"
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `per_minute` units per minute.
+
+    The bucket holds at most `burst_seconds` worth of the rate, so an idle client
+    can send a short burst but never a whole minute's quota at once (the API also
+    enforces limits over windows shorter than a minute). `reserve` always
+    succeeds immediately and returns how long the caller has to wait before
+    using the reservation, so callers are served in arrival order and both
+    threads (time.sleep) and coroutines (asyncio.sleep) can share one bucket.
+    """
+
+    def __init__(self, per_minute, burst_seconds=1.0):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, amount=1):
+        # Amounts above the capacity are allowed; they leave the bucket in debt
+        amount = float(amount)
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return max(0.0, -self.tokens / self.rate)
+
+
+def _is_retryable(error):
+    # 429s and server-side failures are transient, every other 4xx is a bug in the request
+    if isinstance(error, (APIConnectionError, APITimeoutError)):
+        return True
+    return isinstance(error, APIStatusError) and (error.status_code == 429 or error.status_code >= 500)
+
+
+class RateLimitedClient:
+    """Shared OpenAI client that schedules embedding and chat requests.
+
+    Every request first reserves capacity from a requests-per-minute and a
+    tokens-per-minute bucket, each allowing bursts of `burst_seconds` of its
+    rate, then runs with the SDK's own retries disabled. 429 and 5xx responses
+    are retried with exponential backoff and full jitter, honouring Retry-After
+    when the server sends it. The sync methods can be
+    called from any number of threads; the `a*` coroutines and `aembed_many`
+    / `embed_many` run requests concurrently up to `max_concurrency`. Code that
+    runs the coroutines on its own event loop should `await aclose()` before the
+    loop ends; `embed_many` does so itself.
+    """
+
+    def __init__(
+        self,
+        api_key=None,
+        base_url=None,
+        requests_per_minute=3000,
+        tokens_per_minute=1_000_000,
+        burst_seconds=1.0,
+        max_retries=6,
+        base_delay=0.5,
+        max_delay=30.0,
+        max_concurrency=16,
+        timeout=60.0,
+    ):
+        self.client_kwargs = {"api_key": api_key, "base_url": base_url, "max_retries": 0, "timeout": timeout}
+        self.client = OpenAI(**self.client_kwargs)
+        self._async_clients = {}
+        self.request_bucket = TokenBucket(requests_per_minute, burst_seconds)
+        self.token_bucket = TokenBucket(tokens_per_minute, burst_seconds)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_concurrency = max_concurrency
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    @property
+    def async_client(self):
+        # The async HTTP pool is bound to the event loop it was created on
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._async_clients:
+                # Loops that have finished can no longer close their clients; drop them
+                self._async_clients = {
+                    other: client for other, client in self._async_clients.items() if not other.is_closed()
+                }
+                self._async_clients[loop] = AsyncOpenAI(**self.client_kwargs)
+            return self._async_clients[loop]
+
+    async def aclose(self):
+        """Close the async client of the running event loop, if one was created."""
+        with self._lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+    def _count_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def estimate_tokens(self, value):
+        # Inputs may be a string, a list of token ids, or a list of either
+        if isinstance(value, str):
+            return len(tiktoken.get_encoding(TOKEN_ENCODING).encode(value))
+        if isinstance(value, dict):
+            return self.estimate_tokens(value.get("content") or "")
+        value = list(value)
+        if value and isinstance(value[0], int):
+            return len(value)
+        return sum(self.estimate_tokens(v) for v in value)
+
+    def _reserve(self, tokens):
+        return max(self.request_bucket.reserve(1), self.token_bucket.reserve(tokens))
+
+    def _backoff(self, attempt, error):
+        retry_after = None
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                pass
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    def _call(self, request, tokens):
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self._reserve(tokens))
+            try:
+                return request()
+            except Exception as e:
+                if attempt == self.max_retries or not _is_retryable(e):
+                    raise
+                self._count_retry()
+                time.sleep(self._backoff(attempt, e))
+
+    async def _acall(self, request, tokens):
+        for attempt in range(self.max_retries + 1):
+            await asyncio.sleep(self._reserve(tokens))
+            try:
+                return await request()
+            except Exception as e:
+                if attempt == self.max_retries or not _is_retryable(e):
+                    raise
+                self._count_retry()
+                await asyncio.sleep(self._backoff(attempt, e))
+
+    def embed(self, input, model):
+        """Return one embedding per input; a single string or token list gives a one-item list."""
+        response = self._call(lambda: self.client.embeddings.create(model=model, input=input), self.estimate_tokens(input))
+        return [item.embedding for item in response.data]
+
+    def chat(self, messages, model, **kwargs):
+        response = self._call(
+            lambda: self.client.chat.completions.create(model=model, messages=messages, **kwargs),
+            self.estimate_tokens(messages),
+        )
+        return response.choices[0].message.content
+
+    async def aembed(self, input, model):
+        response = await self._acall(
+            lambda: self.async_client.embeddings.create(model=model, input=input), self.estimate_tokens(input)
+        )
+        return [item.embedding for item in response.data]
+
+    async def achat(self, messages, model, **kwargs):
+        response = await self._acall(
+            lambda: self.async_client.chat.completions.create(model=model, messages=messages, **kwargs),
+            self.estimate_tokens(messages),
+        )
+        return response.choices[0].message.content
+
+    async def aembed_many(self, inputs, model):
+        """Embed each item of `inputs` with at most `max_concurrency` requests in flight."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def embed_one(input):
+            async with semaphore:
+                return (await self.aembed(input, model))[0]
+
+        return await asyncio.gather(*(embed_one(input) for input in inputs))
+
+    def embed_many(self, inputs, model):
+        async def run():
+            try:
+                return await self.aembed_many(inputs, model)
+            finally:
+                await self.aclose()
+
+        return asyncio.run(run())
@@ -0,0 +1,93 @@
+# Standard Libraries
+import math
+import re
+from collections import Counter, defaultdict
+
+# Third-Party Libraries
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z]+|\d+")
+# A subject code followed by a number, e.g. "CSE 144" or "cse144"
+COURSE_CODE_PATTERN = re.compile(r"\b([a-z]{2,5}) ?(\d{1,3}[a-z]?)\b")
+
+
+def tokenize(text):
+    """Lowercase word and number tokens, plus one joined token per course code.
+
+    "CSE 144" and "CSE144" both produce "cse144", so a course code query matches
+    regardless of spacing, on top of the separate "cse" and "144" tokens.
+    """
+    text = text.lower()
+    tokens = TOKEN_PATTERN.findall(text)
+    tokens += [subject + number for subject, number in COURSE_CODE_PATTERN.findall(text)]
+    return tokens
+
+
+class BM25Index:
+    """Inverted index over chunk text, scored with Okapi BM25.
+
+    Documents are addressed by row number, the same row numbers VectorIndex uses.
+    Each term keeps a posting list of rows and term frequencies, so scoring a
+    query only touches the rows that contain at least one of its terms.
+    Removed rows stop counting towards document lengths, but stay in the posting
+    lists (and document frequencies) until the owner rebuilds the index; callers
+    filter them out of the results.
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._rows = defaultdict(list)
+        self._frequencies = defaultdict(list)
+        self._posting_arrays = {}
+        self._lengths = []
+        self._length_array = None
+        self.n_documents = 0
+        self.total_length = 0
+
+    def add(self, rows, texts):
+        for row, text in zip(rows, texts):
+            counts = Counter(tokenize(text) if isinstance(text, str) else ())
+            length = sum(counts.values())
+            if row >= len(self._lengths):
+                self._lengths.extend([0] * (row + 1 - len(self._lengths)))
+            self._lengths[row] = length
+            self.n_documents += 1
+            self.total_length += length
+            for term, frequency in counts.items():
+                self._rows[term].append(row)
+                self._frequencies[term].append(frequency)
+        self._posting_arrays.clear()
+        self._length_array = None
+
+    def remove(self, rows):
+        for row in rows:
+            self.n_documents -= 1
+            self.total_length -= self._lengths[row]
+
+    def _postings(self, term):
+        if term not in self._posting_arrays:
+            self._posting_arrays[term] = (
+                np.asarray(self._rows.get(term, ()), dtype=np.int64),
+                np.asarray(self._frequencies.get(term, ()), dtype=np.float32),
+            )
+        return self._posting_arrays[term]
+
+    def scores(self, query):
+        """Return (rows, scores) for every row containing at least one query term."""
+        if self._length_array is None:
+            self._length_array = np.asarray(self._lengths, dtype=np.float32)
+        average_length = self.total_length / max(1, self.n_documents)
+        matched_rows, matched_scores = [], []
+        for term in set(tokenize(query)):
+            rows, frequencies = self._postings(term)
+            if len(rows) == 0:
+                continue
+            idf = math.log(1.0 + (self.n_documents - len(rows) + 0.5) / (len(rows) + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * self._length_array[rows] / (average_length or 1.0))
+            matched_rows.append(rows)
+            matched_scores.append(idf * frequencies * (self.k1 + 1.0) / (frequencies + norm))
+        if not matched_rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        rows, inverse = np.unique(np.concatenate(matched_rows), return_inverse=True)
+        return rows, np.bincount(inverse, weights=np.concatenate(matched_scores)).astype(np.float32)
@@ -0,0 +1,110 @@
+# Standard Libraries
+import time
+
+# Third-Party Libraries
+import numpy as np
+
+
+def _normalize(vectors):
+    # Scale each row to unit length so dot products are cosine similarities
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class CentroidCategorizer:
+    """Assigns a category to a document embedding by nearest category centroid.
+
+    Centroids are either seeded from embeddings of short category descriptions or
+    fit from documents that already carry a label (e.g. the LLM labels stored in
+    the llm_category column of embedded_data.csv). Predictions whose margin over
+    the runner-up category is below `min_margin` are handed to the optional
+    `fallback` callable instead.
+    """
+
+    def __init__(self, categories, min_margin=0.02, fallback=None):
+        self.categories = list(categories)
+        self.min_margin = min_margin
+        self.fallback = fallback
+        self.centroids = None
+
+    def fit(self, vectors, labels):
+        # Average the unit-length embeddings of every document with the same label
+        vectors = _normalize(vectors)
+        labels = np.asarray(labels)
+        centroids = []
+        for category in self.categories:
+            members = vectors[labels == category]
+            if len(members) == 0:
+                raise ValueError(f"No labelled documents for category '{category}'")
+            centroids.append(members.mean(axis=0))
+        self.centroids = _normalize(centroids)
+        return self
+
+    def fit_descriptions(self, description_vectors):
+        # description_vectors holds one embedding per category, in self.categories order
+        if len(description_vectors) != len(self.categories):
+            raise ValueError("Expected one description embedding per category")
+        self.centroids = _normalize(description_vectors)
+        return self
+
+    def scores(self, vectors):
+        if self.centroids is None:
+            raise RuntimeError("Categorizer has not been fit")
+        return _normalize(vectors) @ self.centroids.T
+
+    def predict(self, vectors):
+        """Return (categories, margins) for a batch of document embeddings."""
+        scores = self.scores(np.atleast_2d(vectors))
+        if scores.shape[1] == 1:
+            return [self.categories[0]] * len(scores), np.ones(len(scores), dtype=np.float32)
+        # Margin between the best and runner-up category is the confidence
+        rows = np.arange(len(scores))
+        order = np.argsort(-scores, axis=1)
+        first, second = order[:, 0], order[:, 1]
+        margins = scores[rows, first] - scores[rows, second]
+        return [self.categories[i] for i in first], margins
+
+    def categorize(self, chunk_vectors, text=None):
+        """Categorize one document from the embeddings of its content chunks.
+
+        The document embedding is the mean of its chunk embeddings. Low-confidence
+        predictions are sent to `fallback(text)` when both are available.
+        """
+        return self.categorize_with_fallback(chunk_vectors, text)[0]
+
+    def categorize_with_fallback(self, chunk_vectors, text=None):
+        """Like `categorize`, but return (category, fallback_category).
+
+        `fallback_category` is the valid label returned by the fallback, or None
+        when the fallback was not called or answered with an unknown category.
+        """
+        if len(chunk_vectors) == 0:
+            raise ValueError("Cannot categorize a document without content chunks")
+        document_vector = _normalize(chunk_vectors).mean(axis=0)
+        (category,), (margin,) = self.predict(document_vector)
+        if margin < self.min_margin and self.fallback is not None and text is not None:
+            fallback_category = self.fallback(text)
+            if fallback_category in self.categories:
+                return fallback_category, fallback_category
+        return category, None
+
+
+def evaluate(categorizer, vectors, reference_labels):
+    """Compare local predictions against reference (LLM) labels.
+
+    Returns a dict with the agreement rate, the share of documents that would be
+    routed to the fallback, and the local throughput in documents per second.
+    """
+    reference_labels = list(reference_labels)
+    start = time.perf_counter()
+    predicted, margins = categorizer.predict(vectors)
+    elapsed = time.perf_counter() - start
+    agreement = np.mean([p == r for p, r in zip(predicted, reference_labels)])
+    return {
+        "documents": len(reference_labels),
+        "agreement": float(agreement),
+        "low_confidence": float(np.mean(margins < categorizer.min_margin)),
+        "docs_per_second": len(reference_labels) / elapsed if elapsed > 0 else float("inf"),
+    }
@@ -0,0 +1,57 @@
+# Standard Libraries
+import hashlib
+from itertools import islice
+
+# Third-Party Libraries
+import tiktoken
+
+EMBEDDING_CTX_LENGTH = 8191
+EMBEDDING_ENCODING = "cl100k_base"
+
+
+def batched(iterable, n):
+    """Batch data into tuples of length n. The last batch may be shorter."""
+    # batched('ABCDEFG', 3) --> ABC DEF G
+    if n < 1:
+        raise ValueError("n must be at least one")
+    it = iter(iterable)
+    while batch := tuple(islice(it, n)):
+        yield batch
+
+
+def chunked_tokens(text, chunk_length, encoding_name="cl100k_base"):
+    # Get the encoding object for the specified encoding name. OpenAI's tiktoken library, which is used in this notebook, currently supports two encodings: 'bpe' and 'cl100k_base'. The 'bpe' encoding is used for GPT-3 and earlier models, while 'cl100k_base' is used for newer models like GPT-4.
+    encoding = tiktoken.get_encoding(encoding_name)
+    # Encode the input text into tokens
+    tokens = encoding.encode(text)
+    # Create an iterator that yields chunks of tokens of the specified length
+    chunks_iterator = batched(tokens, chunk_length)
+    # Yield each chunk from the iterator
+    yield from chunks_iterator
+
+
+def chunked_pages(pages, chunk_length, encoding_name="cl100k_base"):
+    """Chunk a stream of (page_number, text) pairs into token chunks.
+
+    Yields (tokens, first_page, last_page) so every chunk can cite the pages it
+    came from. Chunks are produced while later pages are still being read.
+    """
+    encoding = tiktoken.get_encoding(encoding_name)
+    tokens, token_pages = [], []
+    for page_number, text in pages:
+        page_tokens = encoding.encode(text)
+        tokens.extend(page_tokens)
+        token_pages.extend([page_number] * len(page_tokens))
+        while len(tokens) >= chunk_length:
+            yield tuple(tokens[:chunk_length]), token_pages[0], token_pages[chunk_length - 1]
+            del tokens[:chunk_length], token_pages[:chunk_length]
+    if tokens:
+        yield tuple(tokens), token_pages[0], token_pages[-1]
+
+
+def chunk_id(source, text):
+    # Stable across runs: depends only on where the chunk came from and what it says,
+    # so unchanged chunks keep their id when other files are added or removed
+    source_hash = hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+    text_hash = hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+    return f"{source_hash}_{text_hash}"
@@ -0,0 +1,209 @@
+"""Streaming ingestion from the web crawler straight into a VectorIndex.
+
+Pages flow through three stages connected by bounded queues: chunking,
+embedding (several workers sharing one RateLimitedClient) and indexing. Each
+page is searchable as soon as its chunks are embedded; there is no intermediate
+CSV and memory use is bounded by the queue sizes, not by the size of the crawl.
+Chunk ids are derived from the page URL and chunk content, so re-running against
+a saved index only embeds new or changed chunks and deletes the stale ones.
+Chunk text is indexed for BM25 as it is added, so queries use hybrid search.
+
+    python ingest.py --start-url https://admissions.ucsc.edu/ --base-url ucsc.edu --index-dir index --query "How do I apply?"
+"""
+
+# Standard Libraries
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+# Third-Party Libraries
+import tiktoken
+
+# Local Modules
+from api_client import RateLimitedClient
+from chunking import (
+    EMBEDDING_CTX_LENGTH,
+    EMBEDDING_ENCODING,
+    batched,
+    chunk_id,
+    chunked_tokens,
+)
+from vector_index import VectorIndex
+
+_DONE = object()
+
+
+class StreamingIngestor:
+    """Chunk, embed and index an iterable of crawled pages as it is produced.
+
+    `pages` yields dicts with at least "url" and "text" (and optionally "title"),
+    which is exactly what WebCrawler.crawl produces. Rows carry their page URL in
+    a "url" metadata field, which should be one of the index's `indexed_fields`.
+    """
+
+    def __init__(
+        self,
+        client,
+        index,
+        embeddings_model,
+        categorizer=None,
+        chunk_length=EMBEDDING_CTX_LENGTH,
+        encoding_name=EMBEDDING_ENCODING,
+        embed_batch_size=16,
+        embed_workers=4,
+        queue_size=32,
+    ):
+        self.client = client
+        self.index = index
+        self.embeddings_model = embeddings_model
+        self.categorizer = categorizer
+        self.chunk_length = chunk_length
+        self.encoding = tiktoken.get_encoding(encoding_name)
+        self.encoding_name = encoding_name
+        self.embed_batch_size = embed_batch_size
+        self.embed_workers = embed_workers
+        self.queue_size = queue_size
+
+    def _chunk_stage(self, pages, chunk_queue, seen_urls, errors):
+        try:
+            for page in pages:
+                seen_urls.add(page["url"])
+                chunks = {}
+                for tokens in chunked_tokens(page["text"], self.chunk_length, encoding_name=self.encoding_name):
+                    text = self.encoding.decode(tokens)
+                    chunks.setdefault(chunk_id(page["url"], text), (list(tokens), text))
+
+                # Only chunks the index has not seen go on to be embedded
+                existing = set(self.index.live_ids({"url": page["url"]}))
+                new_chunks = {i: chunk for i, chunk in chunks.items() if i not in existing}
+                removed = sorted(existing - chunks.keys())
+                if new_chunks or removed:
+                    chunk_queue.put((page, new_chunks, removed))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            for _ in range(self.embed_workers):
+                chunk_queue.put(_DONE)
+
+    def _embed_stage(self, chunk_queue, index_queue):
+        while (item := chunk_queue.get()) is not _DONE:
+            page, new_chunks, removed = item
+            try:
+                vectors = []
+                for batch in batched([tokens for tokens, _ in new_chunks.values()], self.embed_batch_size):
+                    vectors.extend(self.client.embed(list(batch), self.embeddings_model))
+                index_queue.put((page, new_chunks, vectors, removed))
+            except Exception as e:
+                print(f"Error embedding {page['url']}: {str(e)}")
+        index_queue.put(_DONE)
+
+    def _index_page(self, page, new_chunks, vectors, removed):
+        if new_chunks:
+            texts = [text for _, text in new_chunks.values()]
+            category = self.categorizer.categorize(vectors, text=texts[0]) if self.categorizer else None
+            metadata = [
+                {"url": page["url"], "title": page.get("title", page["url"]), "text": text, "category": category}
+                for text in texts
+            ]
+            self.index.upsert(list(new_chunks), vectors, metadata)
+        return len(new_chunks), self.index.delete(removed)
+
+    def run(self, pages, prune=False):
+        """Consume `pages` until exhausted and return ingestion statistics.
+
+        With `prune=True` rows whose URL was not produced by `pages` are deleted,
+        which is what a full re-crawl wants.
+        """
+        chunk_queue = queue.Queue(maxsize=self.queue_size)
+        index_queue = queue.Queue(maxsize=self.queue_size)
+        seen_urls = set()
+        errors = []
+        threads = [
+            threading.Thread(target=self._chunk_stage, args=(pages, chunk_queue, seen_urls, errors), daemon=True)
+        ]
+        threads += [
+            threading.Thread(target=self._embed_stage, args=(chunk_queue, index_queue), daemon=True)
+            for _ in range(self.embed_workers)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        stats = {"pages": 0, "chunks": 0, "deleted": 0, "first_searchable_seconds": None}
+        finished_workers = 0
+        while finished_workers < self.embed_workers:
+            item = index_queue.get()
+            if item is _DONE:
+                finished_workers += 1
+                continue
+            page = item[0]
+            try:
+                added, deleted = self._index_page(*item)
+            except Exception as e:
+                print(f"Error indexing {page['url']}: {str(e)}")
+                continue
+            stats["pages"] += 1
+            stats["chunks"] += added
+            stats["deleted"] += deleted
+            if stats["first_searchable_seconds"] is None:
+                stats["first_searchable_seconds"] = time.perf_counter() - start
+            print(f"Indexed {page['url']} ({stats['pages']} pages, {stats['chunks']} chunks)")
+
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        if prune:
+            stats["deleted"] += self.index.delete(self.index.live_ids({"url": lambda url: url not in seen_urls}))
+        stats["unchanged_pages"] = len(seen_urls) - stats["pages"]
+        stats["seconds"] = time.perf_counter() - start
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--start-url", default="https://admissions.ucsc.edu/")
+    parser.add_argument("--base-url", default="ucsc.edu")
+    parser.add_argument("--max-depth", type=int, default=10)
+    parser.add_argument("--embeddings-model", default="text-embedding-3-small")
+    parser.add_argument("--index-dir", help="load the index from and save it back to this directory")
+    parser.add_argument("--query", action="append", default=[])
+    args = parser.parse_args()
+
+    # The crawler lives in the backend package
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+    from src.Web.WebCrawler import ContentExtractor, LinkResolver, SessionManager, WebCrawler
+
+    openai_api_key = json.load(open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "openai.json")))["key"]
+    client = RateLimitedClient(api_key=openai_api_key)
+    if args.index_dir and os.path.exists(args.index_dir):
+        index = VectorIndex.load(args.index_dir)
+        print(f"Loaded {len(index)} chunks from {args.index_dir}")
+    else:
+        index = VectorIndex(indexed_fields=("category", "url"), text_field="text")
+
+    crawler = WebCrawler(SessionManager, LinkResolver, ContentExtractor)
+    pages = crawler.crawl(args.start_url, args.base_url, args.max_depth)
+    stats = StreamingIngestor(client, index, args.embeddings_model).run(pages, prune=True)
+    print(
+        f"Indexed {stats['pages']} changed pages ({stats['chunks']} new chunks, {stats['deleted']} deleted, "
+        f"{stats['unchanged_pages']} pages unchanged) in {stats['seconds']:.1f}s, "
+        f"first page searchable after {stats['first_searchable_seconds'] or 0:.1f}s"
+    )
+    if args.index_dir:
+        index.save(args.index_dir)
+
+    for query in args.query:
+        print(f"\n{query}")
+        embedding = client.embed(query, args.embeddings_model)[0]
+        search = index.hybrid_search(query, embedding, top_k=4) if index.lexical else index.search(embedding, top_k=4)
+        for row in search:
+            print(f"url: {row['url']}, distance: {row['distance']}, text_truncated: {row['text'][0:100]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Standard Libraries
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+# Third-Party Libraries
+from PyPDF2 import PdfReader
+
+# Each worker process opens a PDF once and keeps it open for the pages it is handed.
+# A shared pool sees several files, so only the most recent few stay open
+_readers = {}
+MAX_OPEN_READERS = 4
+
+
+def _reader_for(pdf_path):
+    reader = _readers.get(pdf_path)
+    if reader is None:
+        if len(_readers) >= MAX_OPEN_READERS:
+            _readers.clear()
+        reader = _readers[pdf_path] = PdfReader(pdf_path)
+    return reader
+
+
+def _extract_page(pdf_path, page_index):
+    return page_index + 1, _reader_for(pdf_path).pages[page_index].extract_text() or ""
+
+
+def pdf_process_pool(max_workers=None):
+    """Process pool for `iter_pdf_pages`, to share across files and threads.
+
+    Workers are spawned rather than forked: forking a process that runs other
+    threads can copy locks they hold (stdout, HTTP pools) and deadlock. Spawned
+    workers import the main module, so scripts must guard their entry point
+    with `if __name__ == "__main__":`.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def iter_pdf_pages(pdf_path, max_workers=None, executor=None):
+    """Yield (page_number, text) for every page, in order, starting at page 1.
+
+    Pages are extracted across a process pool and yielded as soon as the next
+    page in order is ready, so consumers can start before the document is done.
+    Pass `executor` (from `pdf_process_pool`) to share one pool between files;
+    otherwise a pool of `max_workers` processes is created for this file.
+    """
+    page_count = len(PdfReader(pdf_path).pages)
+    workers = min(max_workers or os.cpu_count() or 1, max(page_count, 1))
+    extract = partial(_extract_page, pdf_path)
+    chunksize = max(1, page_count // (8 * workers))
+    if executor is not None:
+        yield from executor.map(extract, range(page_count), chunksize=chunksize)
+        return
+    if workers == 1:
+        yield from map(extract, range(page_count))
+        return
+
+    with pdf_process_pool(workers) as executor:
+        yield from executor.map(extract, range(page_count), chunksize=chunksize)
@@ -0,0 +1,365 @@
+# Standard Libraries
+import json
+import os
+import threading
+from collections import defaultdict
+
+# Third-Party Libraries
+import numpy as np
+
+# Local Modules
+from bm25 import BM25Index
+
+# Partitions larger than this share of the rows are scored with a full scan
+FULL_SCAN_FRACTION = 0.25
+
+
+class VectorIndex:
+    """In-memory cosine index over chunk embeddings with metadata pre-filtering.
+
+    Every row keeps its id, a unit-length vector and a metadata dict. For each
+    field in `indexed_fields` the index keeps a posting list of row ids per value,
+    so a search with `category=` (or any equality predicate in `where=`) only scores
+    the vectors in the matching partition instead of rescanning the whole table.
+    Adds and searches are serialized, so the index can be queried while it is fed.
+
+    Ids are unique. `upsert` replaces rows whose id already exists and `delete`
+    marks rows as deleted; deleted rows are skipped by every search until
+    `compact` drops them.
+
+    With `text_field` set, the text in that metadata field is also indexed for
+    BM25 keyword search, and `hybrid_search` scores only the best lexical
+    candidates with embeddings instead of every vector.
+    """
+
+    def __init__(self, indexed_fields=("category",), text_field=None):
+        self.indexed_fields = tuple(indexed_fields)
+        self.text_field = text_field
+        self.lexical = BM25Index() if text_field else None
+        self.ids = []
+        self.metadata = []
+        self._vectors = None
+        self._postings = {field: defaultdict(list) for field in self.indexed_fields}
+        self._posting_arrays = {}
+        self._rows = {}
+        self._live = np.empty(0, dtype=bool)
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, row_id):
+        return row_id in self._rows
+
+    @property
+    def vectors(self):
+        if self._vectors is None:
+            # Nothing has been added yet, so the dimension is unknown
+            return np.empty((0, 0), dtype=np.float32)
+        return self._vectors[: len(self.ids)]
+
+    def _reserve(self, n_rows, dim):
+        # Grow the vector matrix geometrically so repeated adds stay amortized O(1)
+        if self._vectors is None:
+            self._vectors = np.empty((max(n_rows, 1024), dim), dtype=np.float32)
+        elif self._vectors.shape[1] != dim:
+            raise ValueError(f"Expected vectors of dimension {self._vectors.shape[1]}, got {dim}")
+        elif n_rows > len(self._vectors):
+            grown = np.empty((max(n_rows, 2 * len(self._vectors)), dim), dtype=np.float32)
+            grown[: len(self.ids)] = self.vectors
+            self._vectors = grown
+        if n_rows > len(self._live):
+            live = np.zeros(len(self._vectors), dtype=bool)
+            live[: len(self.ids)] = self._live[: len(self.ids)]
+            self._live = live
+
+    def add(self, ids, vectors, metadata=None):
+        with self.lock:
+            duplicates = [row_id for row_id in ids if row_id in self._rows]
+            if duplicates or len(set(ids)) != len(ids):
+                raise ValueError(f"Ids already in the index: {duplicates[:5]}")
+            self._add(ids, vectors, metadata)
+
+    def upsert(self, ids, vectors, metadata=None):
+        """Insert new rows and replace rows whose id already exists."""
+        with self.lock:
+            self._delete(ids)
+            self._add(ids, vectors, metadata)
+
+    def delete(self, ids):
+        """Mark the rows with these ids as deleted and return how many were live."""
+        with self.lock:
+            return self._delete(ids)
+
+    def _delete(self, ids):
+        rows = [self._rows.pop(row_id) for row_id in ids if row_id in self._rows]
+        self._live[rows] = False
+        if self.lexical is not None:
+            self.lexical.remove(rows)
+        return len(rows)
+
+    def live_ids(self, where=None):
+        """Ids of the rows that are not deleted, optionally restricted by `where`."""
+        with self.lock:
+            rows = self.candidate_rows(where)
+            if rows is None:
+                return list(self._rows)
+            return [self.ids[row] for row in rows]
+
+    def _add(self, ids, vectors, metadata):
+        if len(ids) == 0:
+            return
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        metadata = metadata if metadata is not None else [{} for _ in ids]
+        if not len(ids) == len(vectors) == len(metadata):
+            raise ValueError("ids, vectors and metadata must have the same length")
+
+        start = len(self.ids)
+        self._reserve(start + len(ids), vectors.shape[1])
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._vectors[start : start + len(ids)] = vectors / norms
+        self._live[start : start + len(ids)] = True
+
+        for row, (row_id, row_metadata) in enumerate(zip(ids, metadata), start=start):
+            self._rows[row_id] = row
+            self.ids.append(row_id)
+            self.metadata.append(dict(row_metadata))
+            for field in self.indexed_fields:
+                if field in row_metadata:
+                    self._postings[field][row_metadata[field]].append(row)
+        self._posting_arrays.clear()
+        if self.lexical is not None:
+            self.lexical.add(range(start, start + len(ids)), [row.get(self.text_field) for row in metadata])
+
+    def _posting_array(self, field, value):
+        key = (field, value)
+        if key not in self._posting_arrays:
+            self._posting_arrays[key] = np.asarray(self._postings[field].get(value, ()), dtype=np.int64)
+        return self._posting_arrays[key]
+
+    def candidate_rows(self, where=None):
+        """Live row numbers matching `where`, or None when every live row is a candidate.
+
+        `where` maps a field to a value, a list/tuple/set of accepted values, or a
+        callable predicate. Indexed fields are resolved from posting lists; other
+        fields are checked only against rows that survived the indexed ones.
+        """
+        if not where:
+            return None if len(self._rows) == len(self.ids) else np.flatnonzero(self._live[: len(self.ids)])
+        rows = None
+        remaining = {}
+        for field, accepted in where.items():
+            if field not in self.indexed_fields or callable(accepted):
+                remaining[field] = accepted
+                continue
+            values = accepted if isinstance(accepted, (list, tuple, set, frozenset)) else (accepted,)
+            postings = [self._posting_array(field, value) for value in values]
+            if len(postings) == 1:
+                # Posting lists are built in row order, so a single one is already sorted
+                field_rows = postings[0]
+            else:
+                field_rows = np.unique(np.concatenate(postings or [np.empty(0, dtype=np.int64)]))
+            rows = field_rows if rows is None else np.intersect1d(rows, field_rows, assume_unique=True)
+
+        if rows is not None:
+            rows = rows[self._live[rows]]
+        if remaining:
+            scan = np.flatnonzero(self._live[: len(self.ids)]) if rows is None else rows
+            rows = np.asarray(
+                [row for row in scan if all(_matches(self.metadata[row], f, a) for f, a in remaining.items())],
+                dtype=np.int64,
+            )
+        return rows
+
+    def search(self, query_vector, top_k=4, category=None, where=None):
+        """Return the `top_k` nearest rows as dicts with id, distance and metadata.
+
+        Distances are cosine distances (1 - cosine similarity), like VECTOR_SEARCH
+        with distance_type => 'COSINE'.
+        """
+        with self.lock:
+            return self._search(query_vector, top_k, category, where)
+
+    def _search(self, query_vector, top_k, category, where):
+        if not self._rows:
+            return []
+        rows = self.candidate_rows(self._where(category, where))
+
+        query = _unit(query_vector)
+        if rows is None:
+            similarities = self.vectors @ query
+        else:
+            if len(rows) == 0:
+                return []
+            if len(rows) > len(self.ids) * FULL_SCAN_FRACTION:
+                # Gathering a large partition costs more than scoring every row and selecting it
+                similarities = (self.vectors @ query)[rows]
+            else:
+                similarities = self._vectors[rows] @ query
+
+        top_k = min(top_k, len(similarities))
+        best = np.argpartition(-similarities, top_k - 1)[:top_k]
+        best = best[np.argsort(-similarities[best])]
+        results = []
+        for position in best:
+            row = position if rows is None else rows[position]
+            results.append(
+                {"id": self.ids[row], "distance": float(1.0 - similarities[position]), **self.metadata[row]}
+            )
+        return results
+
+    def _where(self, category, where):
+        where = dict(where or {})
+        if category is not None:
+            where["category"] = category
+        return where
+
+    def _lexical_candidates(self, query_text, limit, where):
+        # Live rows matching `where`, ordered by BM25 score, best first
+        rows, scores = self.lexical.scores(query_text)
+        keep = self._live[rows]
+        allowed = self.candidate_rows(where) if where else None
+        if allowed is not None:
+            keep &= np.isin(rows, allowed, assume_unique=True)
+        rows, scores = rows[keep], scores[keep]
+        if len(rows) > limit:
+            best = np.argpartition(-scores, limit - 1)[:limit]
+            rows, scores = rows[best], scores[best]
+        order = np.argsort(-scores, kind="stable")
+        return rows[order], scores[order]
+
+    def lexical_search(self, query_text, top_k=4, category=None, where=None):
+        """Return the `top_k` rows with the highest BM25 score for `query_text`."""
+        if self.lexical is None:
+            raise ValueError("Lexical search needs an index created with text_field")
+        with self.lock:
+            rows, scores = self._lexical_candidates(query_text, top_k, self._where(category, where))
+            return [{"id": self.ids[row], "bm25": float(score), **self.metadata[row]} for row, score in zip(rows, scores)]
+
+    def hybrid_search(
+        self, query_text, query_vector, top_k=4, candidates=100, category=None, where=None, rrf_k=60
+    ):
+        """Rescore the best `candidates` BM25 rows with embeddings and fuse both rankings.
+
+        The lexical and cosine rankings of the candidates are combined with
+        reciprocal rank fusion, 1 / (rrf_k + rank) summed over both. When fewer
+        than `top_k` rows match any query term (or none do), the rest are filled
+        from a vector search and ranked after the candidates, with `bm25` 0.
+        Every row carries `distance`, `bm25` and the fused `score`.
+        """
+        if self.lexical is None:
+            raise ValueError("Hybrid search needs an index created with text_field")
+        with self.lock:
+            where = self._where(category, where)
+            rows, scores = self._lexical_candidates(query_text, candidates, where)
+
+            similarities = self._vectors[rows] @ _unit(query_vector) if len(rows) else np.empty(0, dtype=np.float32)
+            dense_rank = np.empty(len(rows), dtype=np.int64)
+            dense_rank[np.argsort(-similarities, kind="stable")] = np.arange(len(rows))
+            fused = 1.0 / (rrf_k + 1 + np.arange(len(rows))) + 1.0 / (rrf_k + 1 + dense_rank)
+
+            results = []
+            for position in np.argsort(-fused, kind="stable")[:top_k]:
+                row = rows[position]
+                results.append(
+                    {
+                        "id": self.ids[row],
+                        "distance": float(1.0 - similarities[position]),
+                        "bm25": float(scores[position]),
+                        "score": float(fused[position]),
+                        **self.metadata[row],
+                    }
+                )
+            if len(results) < top_k:
+                # Rows without a lexical match rank after every candidate: their only
+                # term is the dense one, continuing the ranks after the candidates
+                matched = {result["id"] for result in results}
+                padding = [
+                    result
+                    for result in self._search(query_vector, top_k + len(rows), None, where)
+                    if result["id"] not in matched
+                ]
+                for rank, result in enumerate(padding[: top_k - len(results)], start=len(rows)):
+                    distance = result.pop("distance")
+                    results.append(
+                        {
+                            "id": result.pop("id"),
+                            "distance": distance,
+                            "bm25": 0.0,
+                            "score": 1.0 / (rrf_k + 1 + rank),
+                            **result,
+                        }
+                    )
+            return results
+
+    def compact(self):
+        """Drop deleted rows and rebuild the posting lists."""
+        with self.lock:
+            live = [row for row in range(len(self.ids)) if self._live[row]]
+            ids = [self.ids[row] for row in live]
+            vectors = self.vectors[live]
+            metadata = [self.metadata[row] for row in live]
+            self.ids, self.metadata, self._rows = [], [], {}
+            self._vectors, self._live = None, np.empty(0, dtype=bool)
+            self._postings = {field: defaultdict(list) for field in self.indexed_fields}
+            self._posting_arrays = {}
+            self.lexical = BM25Index() if self.text_field else None
+            self._add(ids, vectors, metadata)
+
+    def save(self, path):
+        """Write the live rows to `path`/vectors.npy and `path`/rows.json."""
+        with self.lock:
+            live = np.flatnonzero(self._live[: len(self.ids)])
+            os.makedirs(path, exist_ok=True)
+            np.save(os.path.join(path, "vectors.npy"), self.vectors[live])
+            with open(os.path.join(path, "rows.json"), "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "indexed_fields": list(self.indexed_fields),
+                        "text_field": self.text_field,
+                        "ids": [self.ids[row] for row in live],
+                        "metadata": [self.metadata[row] for row in live],
+                    },
+                    f,
+                )
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, "rows.json"), "r", encoding="utf-8") as f:
+            rows = json.load(f)
+        index = cls(indexed_fields=rows["indexed_fields"], text_field=rows.get("text_field"))
+        index.add(rows["ids"], np.load(os.path.join(path, "vectors.npy")), rows["metadata"])
+        return index
+
+    @classmethod
+    def from_dataframe(
+        cls,
+        df,
+        vector_column="content_vector",
+        id_column="id",
+        metadata_columns=("title", "text", "category"),
+        indexed_fields=("category",),
+        text_field=None,
+    ):
+        index = cls(indexed_fields=indexed_fields, text_field=text_field)
+        index.add(
+            list(df[id_column]),
+            np.stack(df[vector_column].to_numpy()),
+            df[list(metadata_columns)].to_dict(orient="records"),
+        )
+        return index
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / (np.linalg.norm(vector) or 1.0)
+
+
+def _matches(row_metadata, field, accepted):
+    value = row_metadata.get(field)
+    if callable(accepted):
+        return accepted(value)
+    if isinstance(accepted, (list, tuple, set, frozenset)):
+        return value in accepted
+    return value == accepted
@@ -3,20 +3,28 @@ import json
 import os
 import csv
 import shutil
-from itertools import islice
 import concurrent.futures
 import yaml
 
 # Third-Party Libraries
 import pandas as pd
 import numpy as np
-from PyPDF2 import PdfReader
 import tiktoken
 from dotenv import load_dotenv
 import pyperclip
 
-# OpenAI Libraries
-from openai import OpenAI
+# Local Modules
+from api_client import RateLimitedClient
+from categorizer import CentroidCategorizer
+from chunking import (
+    EMBEDDING_CTX_LENGTH,
+    EMBEDDING_ENCODING,
+    chunk_id,
+    chunked_pages,
+    chunked_tokens,
+)
+from pdf_extract import iter_pdf_pages, pdf_process_pool
+from vector_index import VectorIndex
 
 # Google Cloud Identity and Credentials
 from google.oauth2 import service_account
@@ -28,7 +36,10 @@ from google.api_core.exceptions import Conflict
 openai_api_key = json.load(
     open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "openai.json"))
 )["key"]
-openai_client = OpenAI(api_key=openai_api_key)
+# Shared client that throttles every embedding and chat request to the account's limits and retries 429/5xx
+openai_client = RateLimitedClient(
+    api_key=openai_api_key, requests_per_minute=3000, tokens_per_minute=1_000_000
+)
 embeddings_model = "text-embedding-3-small"  # We'll use this by default, but you can change to your text-embedding-3-large if desired
 
 # Use default credentials
@@ -39,37 +50,9 @@ project_id = "cse-144-project"
 region = "us-central1"  # e.g: "us-central1"
 
 
-def batched(iterable, n):
-    """Batch data into tuples of length n. The last batch may be shorter."""
-    # batched('ABCDEFG', 3) --> ABC DEF G
-    if n < 1:
-        raise ValueError("n must be at least one")
-    it = iter(iterable)
-    while batch := tuple(islice(it, n)):
-        yield batch
-
-
-def chunked_tokens(text, chunk_length, encoding_name="cl100k_base"):
-    # Get the encoding object for the specified encoding name. OpenAI's tiktoken library, which is used in this notebook, currently supports two encodings: 'bpe' and 'cl100k_base'. The 'bpe' encoding is used for GPT-3 and earlier models, while 'cl100k_base' is used for newer models like GPT-4.
-    encoding = tiktoken.get_encoding(encoding_name)
-    # Encode the input text into tokens
-    tokens = encoding.encode(text)
-    # Create an iterator that yields chunks of tokens of the specified length
-    chunks_iterator = batched(tokens, chunk_length)
-    # Yield each chunk from the iterator
-    yield from chunks_iterator
-
-
-EMBEDDING_CTX_LENGTH = 8191
-EMBEDDING_ENCODING = "cl100k_base"
-
-
 def generate_embeddings(text, model):
     # Generate embeddings for the provided text using the specified model
-    embeddings_response = openai_client.embeddings.create(model=model, input=text)
-    # Extract the embedding data from the response
-    embedding = embeddings_response.data[0].embedding
-    return embedding
+    return openai_client.embed(text, model)[0]
 
 
 def len_safe_get_embedding(
@@ -116,33 +99,70 @@ def categorize_text(text, categories):
         {"role": "user", "content": text},
     ]
     try:
-        # Call the OpenAI API to categorize the text
-        response = openai_client.chat.completions.create(
-            model="gpt-4o", messages=messages
-        )
-
-        # Extract the category from the response
-        category = response.choices[0].message.content
+        # Call the OpenAI API to categorize the text, retrying rate limits and server errors
+        category = openai_client.chat(messages, "gpt-4o")
         return category
     except Exception as e:
         print(f"Error categorizing text: {str(e)}")
         return None
 
 
+# Short descriptions used to seed the local categorizer when no labelled data exists yet
+category_descriptions = {
+    "authentication": "API keys, organizations, authentication and access to the OpenAI API",
+    "models": "Available models, model capabilities, embeddings models, deprecations and model versions",
+    "techniques": "Prompt engineering, fine-tuning, latency and accuracy optimization techniques",
+    "tools": "Function calling, assistants tools, code interpreter, file search and libraries",
+    "setup": "Installing SDKs, quickstart, Python, Node and curl setup, getting started",
+    "billing_limits": "Rate limits, usage tiers, pricing, billing and supported countries",
+    "other": "Release notes, changelog, policies, safety and other documentation",
+}
+
+
+def read_labelled_csv(csv_file):
+    # gpt-4o labels live in llm_category. CSVs written before local categorization
+    # have no such column, and their category column holds gpt-4o labels
+    df = pd.read_csv(csv_file, dtype=str)
+    if "llm_category" not in df.columns:
+        df["llm_category"] = df["category"]
+    df["llm_category"] = df["llm_category"].fillna("")
+    return df
+
+
+def build_categorizer(categories, labelled_csv=None):
+    # Categorize locally from content embeddings and only ask gpt-4o when unsure.
+    # The fallback only sees the first chunk so large documents cannot overflow the context window.
+    categorizer = CentroidCategorizer(
+        categories, fallback=lambda text: categorize_text(text, categories)
+    )
+    if labelled_csv and os.path.exists(labelled_csv):
+        # Fit centroids from the gpt-4o labels of previous runs, one mean vector per document.
+        # The category column holds the categorizer's own predictions, so it is never used here
+        labelled_df = read_labelled_csv(labelled_csv)
+        labelled_df = labelled_df[labelled_df["llm_category"].isin(categories)]
+        if set(labelled_df["llm_category"]) == set(categories):
+            labelled_df["content_vector"] = labelled_df.content_vector.apply(json.loads)
+            documents = labelled_df.groupby("title").agg(
+                content_vector=("content_vector", lambda v: np.mean(list(v), axis=0)),
+                category=("llm_category", "first"),
+            )
+            print(f"Fitting categorizer on {len(documents)} labelled documents")
+            return categorizer.fit(list(documents["content_vector"]), documents["category"])
+    print("Seeding categorizer from category descriptions")
+    return categorizer.fit_descriptions(
+        [generate_embeddings(category_descriptions[c], embeddings_model) for c in categories]
+    )
+
+
 # Example usage
 
 
 def extract_text_from_pdf(pdf_path):
-    # Initialize the PDF reader
-    reader = PdfReader(pdf_path)
-    text = ""
-    # Iterate through each page in the PDF and extract text
-    for page in reader.pages:
-        text += page.extract_text()
-    return text
+    # Extract the pages in parallel and join them once instead of growing a string page by page
+    return "".join(text for _, text in iter_pdf_pages(pdf_path))
 
 
-def process_file(file_path, idx, categories, embeddings_model):
+def process_file(file_path, idx, categorizer, embeddings_model, cache, pdf_pool=None):
     file_name = os.path.basename(file_path)
     print(f"Processing file {idx + 1}: {file_name}")
 
@@ -150,36 +170,84 @@ def process_file(file_path, idx, categories, embeddings_model):
     if file_name.endswith(".txt"):
         with open(file_path, "r", encoding="utf-8") as file:
             text = file.read()
-    # Extract text content from .pdf files
+        chunks = (
+            (chunk, None, None)
+            for chunk in chunked_tokens(
+                text, chunk_length=EMBEDDING_CTX_LENGTH, encoding_name=EMBEDDING_ENCODING
+            )
+        )
+    # Extract .pdf pages in parallel and chunk them as they arrive, remembering each chunk's pages
     elif file_name.endswith(".pdf"):
-        text = extract_text_from_pdf(file_path)
+        chunks = chunked_pages(
+            iter_pdf_pages(file_path, executor=pdf_pool),
+            chunk_length=EMBEDDING_CTX_LENGTH,
+            encoding_name=EMBEDDING_ENCODING,
+        )
 
     title = file_name
-    # Generate embeddings for the title
-    title_vectors, title_text = len_safe_get_embedding(title, embeddings_model)
-    print(f"Generated title embeddings for {file_name}")
-
-    # Generate embeddings for the content
-    content_vectors, content_text = len_safe_get_embedding(text, embeddings_model)
-    print(f"Generated content embeddings for {file_name}")
+    # Chunk ids depend only on the file name and chunk content, so chunks that are
+    # already in the cache from a previous run are reused instead of re-embedded
+    encoding = tiktoken.get_encoding(EMBEDDING_ENCODING)
+    ids, content_text, content_vectors, cached, pages = [], [], [], [], []
+    for chunk, first_page, last_page in chunks:
+        content_text.append(encoding.decode(chunk))
+        ids.append(chunk_id(title, content_text[-1]))
+        cached.append(cache.get(ids[-1]))
+        # Generate embeddings for new or changed content chunks only
+        if cached[-1]:
+            content_vectors.append(json.loads(cached[-1]["content_vector"]))
+        else:
+            content_vectors.append(generate_embeddings(chunk, model=embeddings_model))
+        if first_page is None:
+            pages.append("")
+        elif first_page == last_page:
+            pages.append(str(first_page))
+        else:
+            pages.append(f"{first_page}-{last_page}")
+    if not content_text:
+        # Empty files (or PDFs without extractable text) have nothing to embed or categorize
+        print(f"Skipping {file_name}, it has no text")
+        return []
+    print(
+        f"Generated content embeddings for {file_name} "
+        f"({sum(row is None for row in cached)} new, {sum(row is not None for row in cached)} cached)"
+    )
 
-    category = categorize_text(" ".join(content_text), categories)
+    # Generate embeddings for the title
+    title_vector = next((row["title_vector"] for row in cached if row), None)
+    if title_vector is None:
+        title_vectors, title_text = len_safe_get_embedding(title, embeddings_model)
+        title_vector = json.dumps(title_vectors[0])  # Assuming title is short and has only one chunk
+        print(f"Generated title embeddings for {file_name}")
+
+    # Keep the gpt-4o label of earlier runs as the reference for fitting and evaluation
+    llm_category = next((row["llm_category"] for row in cached if row and row["llm_category"]), "")
+    if cached and all(cached):
+        category = cached[0]["category"]
+    else:
+        category, fallback_category = categorizer.categorize_with_fallback(content_vectors, text=content_text[0])
+        llm_category = fallback_category or llm_category
     print(f"Categorized {file_name} as {category}")
 
     # Prepare the data to be appended
     data = []
+    seen_ids = set()
     for i, content_vector in enumerate(content_vectors):
+        if ids[i] in seen_ids:
+            # Identical chunks within one file share an id; keep the first
+            continue
+        seen_ids.add(ids[i])
         data.append(
             {
-                "id": f"{idx}_{i}",
-                "vector_id": f"{idx}_{i}",
-                "title": title_text[0],
+                "id": ids[i],
+                "vector_id": ids[i],
+                "title": title,
                 "text": content_text[i],
-                "title_vector": json.dumps(
-                    title_vectors[0]
-                ),  # Assuming title is short and has only one chunk
+                "title_vector": title_vector,
                 "content_vector": json.dumps(content_vector),
                 "category": category,
+                "llm_category": llm_category,
+                "pages": pages[i],
             }
         )
         print(f"Appended data for chunk {i + 1}/{len(content_vectors)} of {file_name}")
@@ -187,211 +255,304 @@ def process_file(file_path, idx, categories, embeddings_model):
     return data
 
 
-PROCESS_FILES = True
-
-if PROCESS_FILES:
-    ## Customize the location below if you are using different data besides the OpenAI documentation. Note that if you are using a different dataset, you will need to update the categories list as well.
-    folder_name = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+def add_deleted_column(client, table_id):
+    # create_table(exists_ok=True) leaves the schema of an existing table alone, and
+    # tables from before incremental updates have no deleted column. Their rows read
+    # as deleted = NULL, so queries filter with `deleted IS NOT TRUE`
+    client.query(
+        f"ALTER TABLE IF EXISTS `{table_id}` ADD COLUMN IF NOT EXISTS deleted BOOL"
+    ).result()
 
-    files = [
-        os.path.join(folder_name, f)
-        for f in os.listdir(folder_name)
-        if f.endswith(".txt") or f.endswith(".pdf")
-    ]
-    data = []
 
-    # Process each file concurrently
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = {
-            executor.submit(
-                process_file, file_path, idx, categories, embeddings_model
-            ): idx
-            for idx, file_path in enumerate(files)
-        }
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                result = future.result()
-                data.extend(result)
-            except Exception as e:
-                print(f"Error processing file: {str(e)}")
+PROCESS_FILES = True
 
-    # Write the data to a CSV file
-    csv_file = os.path.join(
-        os.path.dirname(os.path.abspath(__file__)), "embedded_data.csv"
-    )
-    with open(csv_file, "w", newline="", encoding="utf-8") as csvfile:
-        fieldnames = [
-            "id",
-            "vector_id",
-            "title",
-            "text",
-            "title_vector",
-            "content_vector",
-            "category",
+# PDF pages are extracted in spawned worker processes, which import this module
+# again; the pipeline and queries below must only run in the parent process
+if __name__ == "__main__":
+    if PROCESS_FILES:
+        ## Customize the location below if you are using different data besides the OpenAI documentation. Note that if you are using a different dataset, you will need to update the categories list as well.
+        folder_name = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+        files = [
+            os.path.join(folder_name, f)
+            for f in os.listdir(folder_name)
+            if f.endswith(".txt") or f.endswith(".pdf")
         ]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in data:
-            writer.writerow(row)
-            print(f"Wrote row with id {row['id']} to CSV")
-
-    # Convert the CSV file to a Dataframe
-    article_df = pd.read_csv(
-        csv_file,
-    )
-    # Read vectors from strings back into a list using json.loads
-    article_df["title_vector"] = article_df.title_vector.apply(json.loads)
-    article_df["content_vector"] = article_df.content_vector.apply(json.loads)
-    article_df["vector_id"] = article_df["vector_id"].apply(str)
-    article_df["category"] = article_df["category"].apply(str)
-    article_df.head()
+        data = []
 
-    # Define the dataset ID (project_id.dataset_id)
-    raw_dataset_id = "oai_docs"
-    dataset_id = project_id + "." + raw_dataset_id
-
-    client = bigquery.Client(credentials=credentials, project=project_id)
-
-    # Construct a full Dataset object to send to the API
-    dataset = bigquery.Dataset(dataset_id)
+        csv_file = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "embedded_data.csv"
+        )
+        categorizer = build_categorizer(categories, labelled_csv=csv_file)
+
+        # Rows from the previous run, keyed by their stable chunk id
+        cache = {}
+        if os.path.exists(csv_file):
+            cache = {
+                row["id"]: row
+                for row in read_labelled_csv(csv_file).to_dict(orient="records")
+            }
+            print(f"Loaded {len(cache)} cached chunks from {csv_file}")
+
+        # Process each file concurrently. All files share one PDF extraction pool, so
+        # the number of worker processes stays at the CPU count however many threads run
+        with pdf_process_pool() as pdf_pool, concurrent.futures.ThreadPoolExecutor(
+            max_workers=openai_client.max_concurrency
+        ) as executor:
+            futures = {
+                executor.submit(
+                    process_file, file_path, idx, categorizer, embeddings_model, cache, pdf_pool
+                ): idx
+                for idx, file_path in enumerate(files)
+            }
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    result = future.result()
+                    data.extend(result)
+                except Exception as e:
+                    print(f"Error processing file: {str(e)}")
+
+        # Write the data to a CSV file
+        with open(csv_file, "w", newline="", encoding="utf-8") as csvfile:
+            fieldnames = [
+                "id",
+                "vector_id",
+                "title",
+                "text",
+                "title_vector",
+                "content_vector",
+                "category",
+                "llm_category",
+                "pages",
+            ]
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+            for row in data:
+                writer.writerow(row)
+                print(f"Wrote row with id {row['id']} to CSV")
+
+        # Convert the CSV file to a Dataframe
+        article_df = pd.read_csv(
+            csv_file,
+        )
+        # Read vectors from strings back into a list using json.loads
+        article_df["title_vector"] = article_df.title_vector.apply(json.loads)
+        article_df["content_vector"] = article_df.content_vector.apply(json.loads)
+        article_df["vector_id"] = article_df["vector_id"].apply(str)
+        article_df["category"] = article_df["category"].apply(str)
+        article_df.head()
 
-    # Specify the geographic location where the dataset should reside
-    dataset.location = "US"
+        # Define the dataset ID (project_id.dataset_id)
+        raw_dataset_id = "oai_docs"
+        dataset_id = project_id + "." + raw_dataset_id
 
-    # Send the dataset to the API for creation
-    try:
-        dataset = client.create_dataset(dataset, timeout=30)
-        print(f"Created dataset {client.project}.{dataset.dataset_id}")
-    except Conflict:
-        print(f"dataset {dataset.dataset_id } already exists")
-
-    # Read the CSV file, properly handling multiline fields
-    df = pd.read_csv(csv_file, engine="python", quotechar='"', quoting=1)
-
-    # Display the first few rows of the dataframe
-    df.head()
-
-    # Preprocess the data to ensure content_vector is correctly formatted
-    # removing last and first character which are brackets [], comma splitting and converting to float
-    def preprocess_content_vector(row):
-        row["content_vector"] = [
-            float(x) for x in row["content_vector"][1:-1].split(",")
-        ]
-        return row
-
-    # Apply preprocessing to the dataframe
-    df = df.apply(preprocess_content_vector, axis=1)
-
-    # Define the schema of the final table
-    final_schema = [
-        bigquery.SchemaField("id", "STRING"),
-        bigquery.SchemaField("vector_id", "STRING"),
-        bigquery.SchemaField("title", "STRING"),
-        bigquery.SchemaField("text", "STRING"),
-        bigquery.SchemaField("title_vector", "STRING"),
-        bigquery.SchemaField("content_vector", "FLOAT64", mode="REPEATED"),
-        bigquery.SchemaField("category", "STRING"),
-    ]
+        client = bigquery.Client(credentials=credentials, project=project_id)
 
-    # Define the final table ID
-    raw_table_id = "embedded_data"
-    final_table_id = f"{dataset_id}." + raw_table_id
+        # Construct a full Dataset object to send to the API
+        dataset = bigquery.Dataset(dataset_id)
 
-    # Create the final table object
-    idx = -1
-    found = False
+        # Specify the geographic location where the dataset should reside
+        dataset.location = "US"
 
-    while not found:
-        idx += 1
+        # Send the dataset to the API for creation
         try:
-            final_table = bigquery.Table(f"{final_table_id}_{idx}", schema=final_schema)
-            client.get_table(final_table)
-            print(f"Table {final_table_id}_{idx} already exists")
-        except Exception as e:
-            found = True
-            print(f"Table {final_table_id}_{idx} does not exist")
-
-
-    # Send the table to the API for creation
-    final_table = client.create_table(final_table, exists_ok=True)  # API request
-    print(
-        f"Created final table {project_id}.{final_table.dataset_id}.{final_table.table_id}"
-    )
+            dataset = client.create_dataset(dataset, timeout=30)
+            print(f"Created dataset {client.project}.{dataset.dataset_id}")
+        except Conflict:
+            print(f"dataset {dataset.dataset_id } already exists")
+
+        # Read the CSV file, properly handling multiline fields. The gpt-4o reference
+        # labels are only used locally to fit and evaluate the categorizer
+        # pages must stay a string; read as a number, "3" would come back as 3.0
+        df = pd.read_csv(
+            csv_file, engine="python", quotechar='"', quoting=1, dtype={"pages": str}
+        ).drop(columns=["llm_category"])
+
+        # Display the first few rows of the dataframe
+        df.head()
+
+        # Preprocess the data to ensure content_vector is correctly formatted
+        # removing last and first character which are brackets [], comma splitting and converting to float
+        def preprocess_content_vector(row):
+            row["content_vector"] = [
+                float(x) for x in row["content_vector"][1:-1].split(",")
+            ]
+            return row
+
+        # Apply preprocessing to the dataframe
+        df = df.apply(preprocess_content_vector, axis=1)
+        # Text files have no page numbers
+        df["pages"] = df["pages"].fillna("")
+
+        # Define the schema of the final table
+        final_schema = [
+            bigquery.SchemaField("id", "STRING"),
+            bigquery.SchemaField("vector_id", "STRING"),
+            bigquery.SchemaField("title", "STRING"),
+            bigquery.SchemaField("text", "STRING"),
+            bigquery.SchemaField("title_vector", "STRING"),
+            bigquery.SchemaField("content_vector", "FLOAT64", mode="REPEATED"),
+            bigquery.SchemaField("category", "STRING"),
+            bigquery.SchemaField("deleted", "BOOL"),
+            bigquery.SchemaField("pages", "STRING"),
+        ]
 
-    # Convert DataFrame to list of dictionaries for BigQuery insertion
-    rows_to_insert = df.to_dict(orient="records")
+        # Define the final table ID. Ids are stable across runs, so one table is
+        # updated in place instead of creating a new embedded_data_N every time
+        raw_table_id = "embedded_data"
+        final_table_id = f"{dataset_id}." + raw_table_id
+
+        # Send the table to the API for creation
+        final_table = client.create_table(
+            bigquery.Table(final_table_id, schema=final_schema), exists_ok=True
+        )  # API request
+        print(
+            f"Using final table {project_id}.{final_table.dataset_id}.{final_table.table_id}"
+        )
+        add_deleted_column(client, final_table_id)
 
-    # Upload data to the final table
-    errors = client.insert_rows_json(
-        f"{final_table.dataset_id}.{final_table.table_id}", rows_to_insert
-    )  # API request
+        # Compare against every row already in the table, deleted or not, so each id
+        # is stored once and a chunk that comes back is restored instead of re-added
+        existing = {
+            row["id"]: bool(row["deleted"])
+            for row in client.query(f"SELECT id, deleted FROM `{final_table_id}`").result()
+        }
+        live_ids = {row_id for row_id, deleted in existing.items() if not deleted}
+        current_ids = set(df["id"])
 
-    if errors:
-        print(f"Encountered errors while inserting rows: {errors}")
+        # Upload only new or changed chunks. A load job (unlike streaming inserts)
+        # leaves the rows immediately available to the UPDATEs below on later runs
+        rows_to_insert = (
+            df[~df["id"].isin(existing.keys())].assign(deleted=False).to_dict(orient="records")
+        )
+        if rows_to_insert:
+            load_job = client.load_table_from_json(
+                rows_to_insert,
+                final_table_id,
+                job_config=bigquery.LoadJobConfig(
+                    schema=final_schema,
+                    write_disposition="WRITE_APPEND",
+                    schema_update_options=[bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION],
+                ),
+            )  # API request
+            try:
+                load_job.result()
+                print(f"Loaded {len(rows_to_insert)} new rows into {final_table_id}")
+            except Exception as e:
+                print(f"Encountered errors while inserting rows: {load_job.errors or str(e)}")
+        else:
+            print(f"No new rows for {final_table_id}")
+
+        # Undelete chunks that are back in the source files (e.g. a reverted edit)
+        restored_ids = sorted(current_ids & (existing.keys() - live_ids))
+        if restored_ids:
+            client.query(
+                f"UPDATE `{final_table_id}` SET deleted = FALSE WHERE id IN UNNEST(@ids)",
+                job_config=bigquery.QueryJobConfig(
+                    query_parameters=[bigquery.ArrayQueryParameter("ids", "STRING", restored_ids)]
+                ),
+            ).result()
+            print(f"Restored {len(restored_ids)} previously deleted rows in {final_table_id}")
+
+        # Mark chunks that no longer exist in the source files as deleted
+        removed_ids = sorted(live_ids - current_ids)
+        if removed_ids:
+            client.query(
+                f"UPDATE `{final_table_id}` SET deleted = TRUE WHERE id IN UNNEST(@ids)",
+                job_config=bigquery.QueryJobConfig(
+                    query_parameters=[bigquery.ArrayQueryParameter("ids", "STRING", removed_ids)]
+                ),
+            ).result()
+            print(f"Marked {len(removed_ids)} removed rows as deleted in {final_table_id}")
     else:
-        print(f"Successfully loaded data into {dataset_id}:{final_table_id}")
-else:
-    client = bigquery.Client(credentials=credentials, project=project_id)
-
-print("\nTAKE 1")
+        client = bigquery.Client(credentials=credentials, project=project_id)
+        add_deleted_column(client, f"{project_id}.oai_docs.embedded_data")
 
-query = "What model should I use to embed?"
-category = "models"
+    print("\nTAKE 1")
 
-embedding_query = generate_embeddings(query, embeddings_model)
-embedding_query_list = ", ".join(map(str, embedding_query))
+    query = "What model should I use to embed?"
+    category = "models"
 
-query = f"""
-WITH search_results AS (
-  SELECT query.id AS query_id, base.id AS base_id, distance
-  FROM VECTOR_SEARCH(
-    TABLE oai_docs.embedded_data, 'content_vector',
-    (SELECT ARRAY[{embedding_query_list}] AS content_vector, 'query_vector' AS id),
-    top_k => 2, distance_type => 'COSINE', options => '{{"use_brute_force": true}}')
-)
-SELECT sr.query_id, sr.base_id, sr.distance, ed.text, ed.title
-FROM search_results sr
-JOIN oai_docs.embedded_data ed ON sr.base_id = ed.id
-ORDER BY sr.distance ASC
-"""
-
-query_job = client.query(query)
-results = query_job.result()  # Wait for the job to complete
+    embedding_query = generate_embeddings(query, embeddings_model)
+    embedding_query_list = ", ".join(map(str, embedding_query))
 
-for row in results:
-    print(
-        f"query_id: {row['query_id']}, base_id: {row['base_id']}, distance: {row['distance']}, text_truncated: {row['text'][0:100]}"
+    query = f"""
+    WITH search_results AS (
+      SELECT query.id AS query_id, base.id AS base_id, distance
+      FROM VECTOR_SEARCH(
+        (SELECT * FROM oai_docs.embedded_data WHERE deleted IS NOT TRUE), 'content_vector',
+        (SELECT ARRAY[{embedding_query_list}] AS content_vector, 'query_vector' AS id),
+        top_k => 2, distance_type => 'COSINE', options => '{{"use_brute_force": true}}')
     )
+    SELECT sr.query_id, sr.base_id, sr.distance, ed.text, ed.title
+    FROM search_results sr
+    JOIN oai_docs.embedded_data ed ON sr.base_id = ed.id AND ed.deleted IS NOT TRUE
+    ORDER BY sr.distance ASC
+    """
+
+    query_job = client.query(query)
+    results = query_job.result()  # Wait for the job to complete
+
+    for row in results:
+        print(
+            f"query_id: {row['query_id']}, base_id: {row['base_id']}, distance: {row['distance']}, text_truncated: {row['text'][0:100]}"
+        )
 
-print("\nTAKE 2")
+    print("\nTAKE 2")
 
-query = "What model should I use to embed?"
-category = "models"
+    # Kept apart from `query`, which is reused for the SQL below
+    question = "What model should I use to embed?"
+    category = "models"
 
-embedding_query = generate_embeddings(query, embeddings_model)
-embedding_query_list = ", ".join(map(str, embedding_query))
+    embedding_query = generate_embeddings(question, embeddings_model)
+    embedding_query_list = ", ".join(map(str, embedding_query))
 
 
-query = f"""
-WITH search_results AS (
-  SELECT query.id AS query_id, base.id AS base_id, distance
-  FROM VECTOR_SEARCH(
-    (SELECT * FROM oai_docs.embedded_data WHERE category = '{category}'), 
-    'content_vector',
-    (SELECT ARRAY[{embedding_query_list}] AS content_vector, 'query_vector' AS id),
-    top_k => 4, distance_type => 'COSINE', options => '{{"use_brute_force": true}}')
-)
-SELECT sr.query_id, sr.base_id, sr.distance, ed.text, ed.title, ed.category
-FROM search_results sr
-JOIN oai_docs.embedded_data ed ON sr.base_id = ed.id
-ORDER BY sr.distance ASC
-"""
+    query = f"""
+    WITH search_results AS (
+      SELECT query.id AS query_id, base.id AS base_id, distance
+      FROM VECTOR_SEARCH(
+        (SELECT * FROM oai_docs.embedded_data WHERE category = '{category}' AND deleted IS NOT TRUE),
+        'content_vector',
+        (SELECT ARRAY[{embedding_query_list}] AS content_vector, 'query_vector' AS id),
+        top_k => 4, distance_type => 'COSINE', options => '{{"use_brute_force": true}}')
+    )
+    SELECT sr.query_id, sr.base_id, sr.distance, ed.text, ed.title, ed.category
+    FROM search_results sr
+    JOIN oai_docs.embedded_data ed ON sr.base_id = ed.id AND ed.deleted IS NOT TRUE
+    ORDER BY sr.distance ASC
+    """
 
 
-query_job = client.query(query)
-results = query_job.result()  # Wait for the job to complete
+    query_job = client.query(query)
+    results = query_job.result()  # Wait for the job to complete
 
-for row in results:
-    print(
-        f"category: {row['category']}, title: {row['title']}, base_id: {row['base_id']}, distance: {row['distance']}, text_truncated: {row['text'][0:100]}"
-    )
+    for row in results:
+        print(
+            f"category: {row['category']}, title: {row['title']}, base_id: {row['base_id']}, distance: {row['distance']}, text_truncated: {row['text'][0:100]}"
+        )
+
+    print("\nTAKE 3")
+
+    # Same category-filtered search against a local index that keeps per-category
+    # posting lists, so only the rows in the requested category are scored
+    csv_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "embedded_data.csv")
+    if os.path.exists(csv_file):
+        local_df = pd.read_csv(csv_file)
+        local_df["content_vector"] = local_df.content_vector.apply(json.loads)
+        local_df["category"] = local_df["category"].apply(str)
+        local_index = VectorIndex.from_dataframe(local_df, text_field="text")
+
+        for row in local_index.search(embedding_query, top_k=4, category=category):
+            print(
+                f"category: {row['category']}, title: {row['title']}, base_id: {row['id']}, distance: {row['distance']}, text_truncated: {row['text'][0:100]}"
+            )
+
+        # Hybrid: BM25 picks the candidates, embeddings rescore only those
+        print("\nTAKE 3 (hybrid)")
+        for row in local_index.hybrid_search(question, embedding_query, top_k=4, category=category):
+            print(
+                f"category: {row['category']}, title: {row['title']}, base_id: {row['id']}, distance: {row['distance']}, bm25: {row['bm25']:.2f}, text_truncated: {row['text'][0:100]}"
+            )
+    else:
+        print(f"Skipping local search, {csv_file} does not exist")